@@ -41,3 +41,46 @@ export async function getChatMessages(sessionId: string): Promise<ChatMessage[]>
   const res = await api.get(`/chat/sessions/${sessionId}/messages`);
   return res.data;
 }
+
+export type ChatStreamEvent =
+  | { type: 'sources'; sources: { document_name: string; text: string }[] }
+  | { type: 'token'; content: string }
+  | { type: 'done'; messages: ChatMessage[] }
+  | { type: 'error'; error: string };
+
+export async function streamMessage(
+  sessionId: string,
+  content: string,
+  onEvent: (event: ChatStreamEvent) => void,
+  provider?: string,
+  signal?: AbortSignal
+): Promise<void> {
+  const params = new URLSearchParams({ content });
+  if (provider) {
+    params.set('provider', provider);
+  }
+
+  const res = await fetch(`${api.defaults.baseURL}/chat/sessions/${sessionId}/messages/stream?${params}`, {
+    method: 'POST',
+    signal,
+  });
+  if (!res.ok || !res.body) {
+    throw new Error(`Chat stream failed with status ${res.status}`);
+  }
+
+  // SSE frames are separated by a blank line
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    const frames = buffer.split('\n\n');
+    buffer = frames.pop() ?? '';
+    for (const frame of frames) {
+      if (frame.startsWith('data: ')) {
+        onEvent(JSON.parse(frame.slice(6)));
+      }
+    }
+  }
+}
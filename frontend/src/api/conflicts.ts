@@ -4,17 +4,53 @@ export interface Conflict {
   id: string;
   new_chunk_id: string;
   existing_chunk_id: string;
+  new_document_id: string | null;
+  existing_document_id: string | null;
   label: string;
   score: number;
   judged_by: string;
   neighbor_sim: number;
   resolution_action: string | null;
+  created_at: string | null;
   new_chunk_text: string;
   existing_chunk_text: string;
 }
 
-export async function listConflicts(): Promise<Conflict[]> {
-  const res = await api.get('/conflicts');
+export interface ConflictFilters {
+  document_id?: string;
+  label?: string;
+  judged_by?: string;
+}
+
+export interface ConflictPage {
+  items: Conflict[];
+  next_cursor: string | null;
+}
+
+export interface ConflictCounts {
+  total: number;
+  by_label: Record<string, number>;
+  by_judged_by: Record<string, number>;
+  dedup_groups: number;
+}
+
+export async function listConflictsPage(cursor?: string | null, filters: ConflictFilters = {}, limit: number = 100): Promise<ConflictPage> {
+  const res = await api.get('/conflicts', {
+    params: { ...filters, limit, cursor: cursor ?? undefined }
+  });
+  return res.data;
+}
+
+export async function listConflicts(filters: ConflictFilters = {}): Promise<Conflict[]> {
+  // First page only; the review queue is worked oldest first
+  const page = await listConflictsPage(null, filters, 200);
+  return page.items;
+}
+
+export async function getConflictCounts(documentId?: string): Promise<ConflictCounts> {
+  const res = await api.get('/conflicts/counts', {
+    params: { document_id: documentId }
+  });
   return res.data;
 }
 
@@ -25,9 +61,10 @@ export async function resolveConflict(conflictId: string, action: 'ignore' | 'su
   return res.data;
 }
 
-export async function resolveAllConflicts(action: 'ignore' | 'supersede' = 'supersede', note?: string): Promise<any> {
+export async function resolveAllConflicts(action: 'ignore' | 'supersede' = 'supersede', note?: string, documentIds?: string[]): Promise<any> {
   const res = await api.post('/conflicts/resolve-all', null, {
-    params: { action, note }
+    params: { action, note, document_id: documentIds },
+    paramsSerializer: { indexes: null } // document_id=a&document_id=b
   });
   return res.data;
 }
@@ -21,6 +21,7 @@ export const ChatInterface: React.FC = () => {
     messages,
     sendMessage,
     isLoading,
+    isStreaming,
     clearMessages
   } = useChat();
 
@@ -149,7 +150,7 @@ export const ChatInterface: React.FC = () => {
           ))
         )}
         
-        {isLoading && (
+        {isLoading && !isStreaming && (
           <div className="flex justify-start">
             <div className="bg-gray-100 rounded-lg px-4 py-2 max-w-xs">
               <div className="flex items-center space-x-2">
@@ -1,6 +1,6 @@
 import { useState, useCallback } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { createChatSession, listChatSessions, sendMessage as apiSendMessage, getChatMessages, ChatSession, ChatMessage } from '../api/chat';
+import { createChatSession, listChatSessions, sendMessage as apiSendMessage, streamMessage, getChatMessages, ChatSession, ChatMessage, ChatStreamEvent } from '../api/chat';
 
 interface ChatSource {
   document_name: string;
@@ -47,10 +47,23 @@ export function useSendMessage() {
   });
 }
 
+// Use Set to remove duplicate document names
+function uniqueSources(raw: { document_name: string }[]): ChatSource[] | undefined {
+  const uniqueDocNames = new Set<string>();
+  raw.forEach(source => {
+    if (source.document_name && typeof source.document_name === 'string') {
+      uniqueDocNames.add(source.document_name);
+    }
+  });
+  const sources = Array.from(uniqueDocNames).map(docName => ({ document_name: docName, chunk_id: '' }));
+  return sources.length > 0 ? sources : undefined;
+}
+
 // Simple chat hook for the chat interface
 export const useChat = () => {
   const [messages, setMessages] = useState<ExtendedChatMessage[]>([]);
   const [isLoading, setIsLoading] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);  // answer tokens are arriving
   const [sessionId, setSessionId] = useState<string | null>(null);
 
   const createSession = useCallback(async () => {
@@ -76,6 +89,12 @@ export const useChat = () => {
     };
     setMessages(prev => [...prev, userMessage]);
 
+    // Replaces the last message (the assistant answer being streamed)
+    const updateLast = (update: (message: ExtendedChatMessage) => ExtendedChatMessage) =>
+      setMessages(prev => [...prev.slice(0, -1), update(prev[prev.length - 1])]);
+
+    let sources: ChatSource[] | undefined;
+    let started = false;
     try {
       // Create session if needed
       let currentSessionId = sessionId;
@@ -83,47 +102,33 @@ export const useChat = () => {
         currentSessionId = await createSession();
       }
 
-      // Send message to API
-      const response = await apiSendMessage(currentSessionId, content, provider);
-      console.log('Full API response:', response);
-      
-      // Find the assistant's response (should be the last message)
-      const assistantMessage = response.messages[response.messages.length - 1];
-      
-      if (assistantMessage && assistantMessage.role === 'assistant') {
-        // Parse sources from response
-        const sources: ChatSource[] = [];
-        if (response.sources && Array.isArray(response.sources)) {
-          console.log('Raw sources from API:', response.sources);
-          
-          // Use Set to remove duplicate document names
-          const uniqueDocNames = new Set<string>();
-          response.sources.forEach((source: any) => {
-            if (source.document_name && typeof source.document_name === 'string') {
-              uniqueDocNames.add(source.document_name);
+      // Stream the answer: sources first, then tokens, then the persisted messages
+      await streamMessage(currentSessionId, content, (event: ChatStreamEvent) => {
+        if (event.type === 'sources') {
+          sources = uniqueSources(event.sources);
+        } else if (event.type === 'token') {
+          if (!started) {
+            started = true;
+            setIsStreaming(true);
+            setMessages(prev => [...prev, { role: 'assistant', content: event.content, sources }]);
+          } else {
+            updateLast(message => ({ ...message, content: message.content + event.content }));
+          }
+        } else if (event.type === 'done') {
+          const assistantMessage = event.messages[event.messages.length - 1];
+          if (assistantMessage && assistantMessage.role === 'assistant') {
+            const final: ExtendedChatMessage = { role: 'assistant', content: assistantMessage.content, sources };
+            if (started) {
+              updateLast(() => final);
+            } else {
+              setMessages(prev => [...prev, final]);
             }
-          });
-          
-          // Convert back to array format
-          uniqueDocNames.forEach(docName => {
-            sources.push({
-              document_name: docName,
-              chunk_id: ''
-            });
-          });
-          
-          console.log('Parsed sources (deduplicated):', sources);
+          }
+        } else if (event.type === 'error') {
+          // The turn was not saved, drop the partial answer
+          throw new Error(event.error);
         }
-        
-        const extendedMessage: ExtendedChatMessage = {
-          role: assistantMessage.role,
-          content: assistantMessage.content,
-          sources: sources.length > 0 ? sources : undefined
-        };
-        
-        console.log('Final message with sources:', extendedMessage);
-        setMessages(prev => [...prev, extendedMessage]);
-      }
+      }, provider);
     } catch (error) {
       console.error('Failed to send message:', error);
       
@@ -132,9 +137,14 @@ export const useChat = () => {
         role: 'assistant',
         content: 'Sorry, I encountered an error. Please try again.'
       };
-      setMessages(prev => [...prev, errorMessage]);
+      if (started) {
+        updateLast(() => errorMessage);
+      } else {
+        setMessages(prev => [...prev, errorMessage]);
+      }
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   }, [sessionId, createSession]);
 
@@ -147,6 +157,7 @@ export const useChat = () => {
     messages,
     sendMessage,
     isLoading,
+    isStreaming,
     clearMessages,
     sessionId
   };
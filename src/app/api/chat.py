@@ -1,20 +1,23 @@
 import uuid
+import json
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from ..database import SessionLocal
 from ..providers.app_context import AppContext
 from ..models.app_models import ChatSession, ChatMessage
-from ..providers.llm import LLMProvider
+from ..providers.registry import get_llm
+from ..services.executors import run_io
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
-llm_provider = LLMProvider()
+llm_provider = get_llm()
 
 def get_db():
     db = SessionLocal()
@@ -45,8 +48,23 @@ def list_sessions(db: Session = Depends(get_db)):
     finally:
         ctx.close_session(s)
 
+def _session_exists(s: Session, session_id: uuid.UUID) -> bool:
+    return s.query(ChatSession.id).filter(ChatSession.id == session_id).first() is not None
+
+def _save_turn(s: Session, session_id: uuid.UUID, content: str, response: str) -> list[dict]:
+    user_msg = ChatMessage(session_id=session_id, role="user", content=content)
+    s.add(user_msg)
+    
+    assistant_msg = ChatMessage(session_id=session_id, role="assistant", content=response)
+    s.add(assistant_msg)
+    s.commit()
+    return [
+        {"id": str(user_msg.id), "role": user_msg.role, "content": user_msg.content},
+        {"id": str(assistant_msg.id), "role": assistant_msg.role, "content": assistant_msg.content}
+    ]
+
 @router.post("/sessions/{session_id}/messages")
-def post_message(session_id: uuid.UUID, content: str, provider: str, db: Session = Depends(get_db)):
+async def post_message(session_id: uuid.UUID, content: str, provider: str, db: Session = Depends(get_db)):
     ctx = AppContext()
     llm_provider.init_tenant(context=ctx, db=db)
     s = ctx.get_db_session()
@@ -54,20 +72,14 @@ def post_message(session_id: uuid.UUID, content: str, provider: str, db: Session
         provider = "gemini"
 
     try:
-        sess = s.query(ChatSession).filter(ChatSession.id == session_id).first()
-        if not sess:
+        if not await run_io(_session_exists, s, session_id):
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Get response BEFORE adding user message to avoid including it in history
-        response, sources = llm_provider.generate_response(content, provider, str(session_id))
+        response, sources = await llm_provider.generate_response(content, provider, str(session_id))
         
         # Now add both messages
-        user_msg = ChatMessage(session_id=session_id, role="user", content=content)
-        s.add(user_msg)
-        
-        assistant_msg = ChatMessage(session_id=session_id, role="assistant", content=response)
-        s.add(assistant_msg)
-        s.commit()
+        messages = await run_io(_save_turn, s, session_id, content, response)
         
         # Format sources to show only document names
         formatted_sources = []
@@ -77,24 +89,77 @@ def post_message(session_id: uuid.UUID, content: str, provider: str, db: Session
                 if isinstance(source, dict) and 'source' in source:
                     formatted_sources.append({
                         "document_name": source['source'],
-                        "text": source.get('text', '')
+                        "text": source.get('text', ''),
+                        "page": source.get('page'),
+                        "section": source.get('section')
                     })
         
         logger.info(f"Formatted sources: {formatted_sources}")
         
         return {
-            "messages": [
-                {"id": str(user_msg.id), "role": user_msg.role, "content": user_msg.content},
-                {"id": str(assistant_msg.id), "role": assistant_msg.role, "content": assistant_msg.content}
-            ],
+            "messages": messages,
             "sources": formatted_sources
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.info(f"Error in post_message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         ctx.close_session(s)
 
+@router.post("/sessions/{session_id}/messages/stream")
+async def post_message_stream(session_id: uuid.UUID, content: str, provider: str):
+    """
+    Streaming variant of `post_message` using SSE.
+    Events: `sources` once retrieval is done, `token` for every answer chunk, then
+    `done` with the persisted messages, or `error` (the turn is then not saved).
+    """
+    ctx = AppContext()
+    llm_provider.init_tenant(context=ctx, db=None)
+    if not provider or provider not in llm_provider.available_providers:
+        provider = "gemini"
+
+    s = ctx.get_db_session()
+    try:
+        if not await run_io(_session_exists, s, session_id):
+            raise HTTPException(status_code=404, detail="Session not found")
+    finally:
+        ctx.close_session(s)
+
+    async def event_generator():
+        try:
+            async for event in llm_provider.stream_response(content, provider, str(session_id)):
+                if event["type"] == "sources":
+                    event["sources"] = [
+                        {"document_name": src["source"], "text": src.get("text", ""), "page": src.get("page"), "section": src.get("section")}
+                        for src in event["sources"]
+                    ]
+                elif event["type"] == "error":
+                    yield f"data: {json.dumps(event)}\n\n"
+                    return
+                elif event["type"] == "answer":
+                    # Persist once the answer is complete
+                    s = ctx.get_db_session()
+                    try:
+                        event = {"type": "done", "messages": await run_io(_save_turn, s, session_id, content, event["content"])}
+                    finally:
+                        ctx.close_session(s)
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.info(f"Error in post_message_stream: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
 @router.get("/sessions/{session_id}/messages")
 def list_messages(session_id: uuid.UUID, db: Session = Depends(get_db)):
     ctx = AppContext()
@@ -1,18 +1,25 @@
 import uuid
+import logging
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 
+from ..config import settings
 from ..database import SessionLocal
 from ..providers.app_context import AppContext
 from ..models.app_models import Conflict, Chunk
-from ..providers.qdrant_client import QdrantProvider
+from ..providers.registry import get_qdrant
+from ..providers.cache import bump_corpus_version
+from ..services import conflicts
 from ..services.ingestion_service import IngestionService
 
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/conflicts", tags=["Conflicts"])
 
-qdrant = QdrantProvider()
+qdrant = get_qdrant()
 ingestion_service = IngestionService()
 
 def get_db():
@@ -23,34 +30,14 @@ def get_db():
         db.close()
 
 @router.get("")
-def list_conflicts(db: Session = Depends(get_db)):
-    ctx = AppContext()
-    s = ctx.get_db_session()
-    try:
-        # Get unresolved contradictions and fetch chunk texts separately
-        contradictions = s.query(Conflict).filter(Conflict.resolved_at.is_(None)).limit(200).all()
-        
-        result = []
-        for contradiction in contradictions:
-            # Get chunk texts separately to avoid join alias conflicts
-            new_chunk = s.query(Chunk).filter(Chunk.id == contradiction.new_chunk_id).first()
-            existing_chunk = s.query(Chunk).filter(Chunk.id == contradiction.existing_chunk_id).first()
-            
-            result.append({
-                "id": str(contradiction.id),
-                "new_chunk_id": str(contradiction.new_chunk_id),
-                "existing_chunk_id": str(contradiction.existing_chunk_id),
-                "label": contradiction.label,
-                "score": contradiction.score,
-                "neighbor_sim": contradiction.neighbor_sim,
-                "judged_by": contradiction.judged_by,
-                "resolution_action": contradiction.resolution_action,
-                "new_chunk_text": new_chunk.text if new_chunk else "Content not available",
-                "existing_chunk_text": existing_chunk.text if existing_chunk else "Content not available",
-            })
-        return result
-    finally:
-        ctx.close_session(s)
+def list_conflicts(cursor: str | None = None, limit: int = 100, document_id: uuid.UUID | None = None, label: str | None = None,
+                   judged_by: str | None = None, resolved: bool = False, db: Session = Depends(get_db)):
+    """Unresolved (or resolved) conflicts, oldest first; pass `next_cursor` back as `cursor` for the next page."""
+    return conflicts.list_conflicts(db, cursor=cursor, limit=limit, document_id=document_id, label=label, judged_by=judged_by, resolved=resolved)
+
+@router.get("/counts")
+def count_conflicts(document_id: uuid.UUID | None = None, resolved: bool = False, db: Session = Depends(get_db)):
+    return conflicts.conflict_counts(db, document_id=document_id, resolved=resolved)
 
 @router.post("/{conflict_id}/resolve")
 def resolve_conflict(conflict_id: uuid.UUID, action: str = "ignore", note: str | None = None, db: Session = Depends(get_db)):
@@ -111,6 +98,7 @@ def resolve_conflict(conflict_id: uuid.UUID, action: str = "ignore", note: str |
         
         # Delete the chunk from database (CASCADE will handle embeddings_meta)
         s.delete(chunk_to_delete)
+        bump_corpus_version(s)
         s.commit()
         
         # Check if the document can be published now
@@ -129,87 +117,52 @@ def resolve_conflict(conflict_id: uuid.UUID, action: str = "ignore", note: str |
         ctx.close_session(s)
 
 @router.post("/resolve-all")
-def resolve_all_conflicts(action: str = "supersede", note: str | None = None, db: Session = Depends(get_db)):
-    """Apply new changes to all conflicting chunks (bulk resolution)"""
+def resolve_all_conflicts(action: str = "supersede", note: str | None = None,
+                          document_id: list[uuid.UUID] | None = Query(default=None), db: Session = Depends(get_db)):
+    """
+    Apply one action to every unresolved conflict (bulk resolution), or only to the
+    conflicts touching the given documents (`?document_id=...`, repeatable).
+    Conflicts are resolved `conflict_resolve_batch_size` at a time, one transaction per batch.
+    """
     if action not in {"ignore", "supersede"}:
         raise HTTPException(status_code=400, detail="Invalid action")
     ctx = AppContext()
     s = ctx.get_db_session()
     try:
-        # Get all unresolved contradictions
-        unresolved = s.query(Conflict).filter(Conflict.resolved_at.is_(None)).all()
-        if not unresolved:
-            return {"resolved_count": 0, "message": "No conflicts to resolve"}
-        
-        now = datetime.now(timezone.utc)
-        
-        # Track which documents might need publishing and chunks to delete
-        affected_documents = set()
-        chunks_to_delete = []
-        chunks_kept = []
-        chunks_removed = []
-        
         ingestion_service.init_tenant(context=ctx, db=s)
-        
-        for c in unresolved:
-            # Get the conflicting chunks
-            new_chunk = s.query(Chunk).filter(Chunk.id == c.new_chunk_id).first()
-            existing_chunk = s.query(Chunk).filter(Chunk.id == c.existing_chunk_id).first()
-            
-            if not new_chunk or not existing_chunk:
-                continue  # Skip if chunks are missing
-            
-            # Determine which chunk to delete based on action
-            if action == "supersede":
-                # Apply new: Delete the existing chunk, keep the new one
-                chunk_to_delete = existing_chunk
-                chunk_to_keep = new_chunk
-                document_id = new_chunk.document_id
-            else:  # action == "ignore"
-                # Keep existing: Delete the new chunk, keep the existing one
-                chunk_to_delete = new_chunk
-                chunk_to_keep = existing_chunk
-                document_id = existing_chunk.document_id
-            
-            chunks_to_delete.append(chunk_to_delete)
-            chunks_kept.append(str(chunk_to_keep.id))
-            chunks_removed.append(str(chunk_to_delete.id))
-            affected_documents.add(document_id)
-            
-            # Mark conflict as resolved
-            c.resolution_action = action
-            c.resolved_at = now
-            c.resolver_note = note or f"Bulk resolution: {action} - kept {chunk_to_keep.id}, removed {chunk_to_delete.id}"
-        
-        # Delete chunks from Qdrant in batch
-        if chunks_to_delete:
-            try:
-                chunk_ids_to_delete = [str(chunk.id) for chunk in chunks_to_delete]
-                qdrant.client.delete(
-                    collection_name=ctx.qdrant_collection,
-                    points_selector=chunk_ids_to_delete
-                )
-            except Exception as e:
-                print(f"Warning: Failed to delete chunks from Qdrant: {e}")
-        
-        # Delete chunks from database
-        for chunk in chunks_to_delete:
-            s.delete(chunk)
-        
-        s.commit()
-        
-        # Check if any documents can be auto-published
-        auto_published_docs = []
-        for doc_id in affected_documents:
-            if ingestion_service._check_and_publish_if_ready(doc_id, s):
-                auto_published_docs.append(str(doc_id))
-        
+        resolved_count, removed_count = 0, 0
+        affected_documents = set()
+        while True:
+            batch = conflicts.resolve_batch(s, action, note, document_ids=document_id, limit=settings.conflict_resolve_batch_size)
+            if not batch["resolved"]:
+                break
+            s.commit()
+
+            # Removed chunks are gone from Postgres; drop their vectors too, and only
+            # then invalidate cached answers, so none is re-cached from the old points
+            if batch["removed_chunk_ids"]:
+                try:
+                    qdrant.delete_points(ctx.qdrant_collection, batch["removed_chunk_ids"], wait=True)
+                except Exception as e:
+                    logger.warning(f"Failed to delete {len(batch['removed_chunk_ids'])} chunks from Qdrant: {e}")
+                bump_corpus_version(s)
+                s.commit()
+            resolved_count += batch["resolved"]
+            removed_count += len(batch["removed_chunk_ids"])
+            affected_documents |= batch["document_ids"]
+            logger.info(f"Bulk resolution: {resolved_count} conflicts resolved, {removed_count} chunks removed")
+
+        if not resolved_count:
+            return {"resolved_count": 0, "message": "No conflicts to resolve"}
+
+        # Documents left without unresolved conflicts can be published
+        auto_published_docs = ingestion_service._publish_ready_documents(affected_documents, s)
+
         return {
-            "resolved_count": len(unresolved), 
+            "resolved_count": resolved_count,
             "action": action,
-            "chunks_kept": chunks_kept,
-            "chunks_removed": chunks_removed,
-            "auto_published_documents": auto_published_docs
+            "chunks_removed_count": removed_count,
+            "auto_published_documents": [str(doc_id) for doc_id in auto_published_docs]
         }
     finally:
         ctx.close_session(s)
@@ -6,8 +6,11 @@ from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from ..config import settings
 from ..database import SessionLocal
 from ..providers.app_context import AppContext
+from ..services import jobs
+from ..services.executors import run_io
 from ..services.ingestion_service import IngestionService
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
@@ -28,15 +31,36 @@ def upload_document(file: UploadFile | str = File(...), title: str | None = Form
     doc = svc.ingest(file=file, title=title)
     return doc
 
-@router.post("/{document_id}/publish")
-async def publish_document(document_id: uuid.UUID, docling: bool = False, db: Session = Depends(get_db)):
+@router.post("/bulk")
+def upload_documents_bulk(files: list[UploadFile] = File(...), publish: bool = True, docling: bool = False, db: Session = Depends(get_db)):
+    """Upload many files and/or zip/tar archives; with `publish`, queue them all for publishing as one batch."""
     ctx = AppContext()
-    print(f"############Publishing document {document_id} with docling={docling}")
     svc.init_tenant(context=ctx, db=db)
-    print(f"###########Initialized service for document {document_id}")
-    res = await svc.publish(document_id, docling=docling)
-    print(f"#############Publish result for document {document_id}: {res}")
-    return res
+    return svc.ingest_bulk(files, publish=publish, docling=docling)
+
+@router.get("/batches/{batch_id}")
+def get_batch_status(batch_id: uuid.UUID):
+    status = jobs.batch_status(batch_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return status
+
+@router.post("/{document_id}/publish", status_code=202)
+def publish_document(document_id: uuid.UUID, docling: bool = False, db: Session = Depends(get_db)):
+    """Queue the document for publishing; a worker picks it up (see app/worker.py)."""
+    ctx = AppContext()
+    svc.init_tenant(context=ctx, db=db)
+    if not svc.document_exists(document_id):
+        raise HTTPException(status_code=404, detail="Document not found")
+    job = jobs.enqueue_publish(db, document_id, docling=docling)
+    return jobs.job_dict(job)
+
+@router.get("/jobs/{job_id}")
+def get_publish_job(job_id: uuid.UUID):
+    job = jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 @router.get("")
 def list_documents(db: Session = Depends(get_db)):
@@ -73,16 +97,53 @@ def delete_document(document_id: uuid.UUID, db: Session = Depends(get_db)):
 
 @router.get("/{document_id}/publish-stream")
 async def publish_document_stream(document_id: uuid.UUID, docling: bool = False):
-    """Stream publishing progress using SSE"""
+    """
+    Stream publishing progress using SSE.
+    Queues a publish job (or follows the one already queued/running for the document)
+    and relays every progress event the worker records on it until the job finishes.
+    """
+    def enqueue():
+        db = SessionLocal()
+        try:
+            return jobs.job_dict(jobs.enqueue_publish(db, document_id, docling=docling))
+        finally:
+            db.close()
+
     async def event_generator():
         try:
             ctx = AppContext()
             svc.init_tenant(context=ctx, db=None)
-            
-            async for event in svc.publish_document_stream(document_id, docling=docling):
-                yield f"data: {json.dumps(event)}\n\n"
-                await asyncio.sleep(0.01)  # Small delay to prevent overwhelming the client
-                
+            if not await run_io(svc.document_exists, document_id):
+                yield f"data: {json.dumps({'stage': 'error', 'error': 'Document not found', 'ok': False})}\n\n"
+                return
+
+            job = await run_io(enqueue)
+            job_id = uuid.UUID(job["job_id"])
+            yield f"data: {json.dumps({'stage': 'queued', 'message': 'Waiting for a publish worker...', 'progress': 0, 'job_id': job['job_id']})}\n\n"
+
+            seen_seq, seen_attempt = 0, job["attempts"]
+            while True:
+                job = await run_io(jobs.get_job, job_id)
+                if not job:
+                    yield f"data: {json.dumps({'stage': 'error', 'error': 'Publish job was removed', 'ok': False})}\n\n"
+                    return
+                # Job is read first, so a finished job's events are all recorded by now
+                if job["event_seq"] != seen_seq:
+                    events = await run_io(jobs.events_since, job_id, seen_seq)
+                    if not events and job["last_event"]:
+                        # Job recorded before the event log existed
+                        events = [(job["event_seq"], job["last_event"])]
+                    seen_seq = job["event_seq"]
+                    for _, event in events:
+                        yield f"data: {json.dumps(event)}\n\n"
+                if job["status"] in ("succeeded", "failed"):
+                    return
+                if job["status"] == "queued" and job["attempts"] != seen_attempt:
+                    seen_attempt = job["attempts"]
+                    event = {"stage": "queued", "message": f"Retrying after error: {job['error']}", "job_id": job["job_id"]}
+                    yield f"data: {json.dumps(event)}\n\n"
+                await asyncio.sleep(settings.job_poll_interval)
+
         except Exception as e:
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
     
@@ -1,13 +1,25 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
+from .providers import registry
+from .services import executors
 
 from .api.ingestion import router as ingestion_router
 from .api.conflicts import router as conflicts_router
 from .api.chat import router as chat_router
 
-app = FastAPI(title="BeyondRAG API", version="1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.warm_up_models:
+        # Conflict analysis (NLI models) runs in the publish worker
+        registry.warm_up({"embeddings", "router"})
+    yield
+    executors.shutdown()
+
+app = FastAPI(title="BeyondRAG API", version="1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,3 +40,8 @@ def health():
         "qdrant_url": settings.qdrant_url,
         "database_url": settings.database_url,
     }
+
+@app.get("/health/models")
+def health_models():
+    """Models loaded in this worker and their memory footprint."""
+    return registry.memory_footprint()
@@ -0,0 +1,69 @@
+"""
+One-off maintenance tasks.
+
+    python -m app.maintenance sync-payloads     # backfill title/status/page/section into Qdrant payloads
+    python -m app.maintenance tune-collection   # apply QDRANT_* HNSW/quantization/on-disk settings
+"""
+import sys
+import logging
+
+from qdrant_client.models import SetPayload, SetPayloadOperation
+
+from .database import SessionLocal
+from .models.app_models import Chunk, Document
+from .providers.app_context import AppContext
+from .providers.registry import get_qdrant
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+def sync_payloads():
+    """Write the denormalized document fields into the payload of every indexed chunk."""
+    ctx = AppContext()
+    qdrant = get_qdrant()
+    qdrant.ensure_collection(ctx.qdrant_collection)
+    s = SessionLocal()
+    try:
+        documents = s.query(Document.id, Document.title, Document.status).all()
+        for doc_id, title, status in documents:
+            chunks = s.query(Chunk.id, Chunk.page, Chunk.section_path).filter(Chunk.document_id == doc_id).all()
+            try:
+                for start in range(0, len(chunks), BATCH_SIZE):
+                    qdrant.client.batch_update_points(
+                        collection_name=ctx.qdrant_collection,
+                        update_operations=[
+                            SetPayloadOperation(set_payload=SetPayload(
+                                payload={"title": title, "status": status, "page": page, "section_path": section_path},
+                                points=[str(chunk_id)],
+                            ))
+                            for chunk_id, page, section_path in chunks[start:start + BATCH_SIZE]
+                        ],
+                    )
+            except Exception as e:
+                # e.g. chunks of a draft that was never embedded
+                logger.warning(f"Skipping document {doc_id}: {e}")
+                continue
+            logger.info(f"Synced {len(chunks)} payloads of document {doc_id} ({status})")
+        logger.info(f"Synced payloads of {len(documents)} documents")
+    finally:
+        s.close()
+
+def tune_collection():
+    """Apply the QDRANT_* tuning settings to the existing collection."""
+    ctx = AppContext()
+    qdrant = get_qdrant()
+    qdrant.ensure_collection(ctx.qdrant_collection)
+    qdrant.tune_collection(ctx.qdrant_collection)
+    logger.info(f"Updated collection {ctx.qdrant_collection}; Qdrant re-indexes in the background")
+
+TASKS = {
+    "sync-payloads": sync_payloads,
+    "tune-collection": tune_collection,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in TASKS:
+        sys.exit(f"usage: python -m app.maintenance {{{','.join(TASKS)}}}")
+    TASKS[sys.argv[1]]()
@@ -0,0 +1,75 @@
+"""
+Schema migrations (Alembic, scripts in app/migrations/versions).
+
+    python -m app.migrate                         # create the database if missing, upgrade to head
+    python -m app.migrate upgrade [revision]
+    python -m app.migrate downgrade <revision>
+    python -m app.migrate revision "add foo"      # autogenerate a revision from the models
+    python -m app.migrate current | history
+
+Databases created before migrations existed (by `create_all`) are adopted by
+the baseline revision, which only creates what is missing.
+"""
+import os
+import argparse
+import logging
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine.url import make_url
+
+from .config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+def alembic_config() -> Config:
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+    return config
+
+def ensure_database():
+    """Create the application database if the server does not have it yet."""
+    app_url = make_url(settings.database_url)
+    admin_engine = create_engine(app_url.set(database="postgres"), isolation_level="AUTOCOMMIT", future=True)
+    try:
+        with admin_engine.connect() as conn:
+            exists = conn.execute(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": app_url.database}).scalar()
+            if not exists:
+                conn.execute(text(f'CREATE DATABASE "{app_url.database}"'))
+                logger.info(f"Created database {app_url.database}")
+    finally:
+        admin_engine.dispose()
+
+def upgrade(revision: str = "head"):
+    ensure_database()
+    command.upgrade(alembic_config(), revision)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("upgrade").add_argument("revision", nargs="?", default="head")
+    commands.add_parser("downgrade").add_argument("revision")
+    commands.add_parser("revision").add_argument("message")
+    commands.add_parser("current")
+    commands.add_parser("history")
+    args = parser.parse_args()
+
+    config = alembic_config()
+    if args.command in (None, "upgrade"):
+        upgrade(getattr(args, "revision", "head"))
+    elif args.command == "downgrade":
+        command.downgrade(config, args.revision)
+    elif args.command == "revision":
+        command.revision(config, message=args.message, autogenerate=True)
+    elif args.command == "current":
+        command.current(config, verbose=True)
+    else:
+        command.history(config)
+
+if __name__ == "__main__":
+    main()
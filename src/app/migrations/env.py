@@ -0,0 +1,43 @@
+from alembic import context
+from sqlalchemy import create_engine, text
+
+from app.database import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+# Serializes concurrent `upgrade` runs (e.g. several containers starting at once)
+MIGRATION_LOCK_ID = 72_410_001
+
+def run_migrations_offline():
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    engine = create_engine(config.get_main_option("sqlalchemy.url"), future=True)
+    try:
+        with engine.connect() as connection:
+            # Session-level lock: it outlives the per-revision transactions and the
+            # autocommit blocks of CONCURRENTLY index builds
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.commit()
+            try:
+                context.configure(connection=connection, target_metadata=target_metadata, transaction_per_migration=True)
+                with context.begin_transaction():
+                    context.run_migrations()
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                connection.commit()
+    finally:
+        engine.dispose()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,146 @@
+"""baseline schema
+
+Creates every table that is missing, so it also adopts databases that were
+built by `create_all` before migrations existed, and brings those up to date
+with the column patches that used to run at startup. Indexes and the conflict
+pair constraint are built concurrently by 0002, outside any transaction.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Schema drift of pre-migration databases (create_all never altered existing tables)
+LEGACY_PATCHES = [
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summary TEXT",
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summary_upto TIMESTAMPTZ",
+    "ALTER TABLE conflicts ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT now()",
+    "ALTER TABLE publish_jobs ADD COLUMN IF NOT EXISTS batch_id UUID",
+]
+
+def _created_at():
+    return sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+
+def upgrade():
+    # Offline (--sql) runs render the script for an empty database
+    existing = set() if op.get_context().as_sql else set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "documents" not in existing:
+        op.create_table(
+            "documents",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("external_ref", sa.String(), nullable=True),
+            sa.Column("title", sa.String(), nullable=True),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("file_hash", sa.String(), nullable=True),
+            sa.Column("storage_key", sa.String(), nullable=True),
+            sa.Column("extension", sa.String(), nullable=True),
+            sa.Column("effective_at", sa.DateTime(timezone=True), nullable=True),
+            _created_at(),
+        )
+    if "chunks" not in existing:
+        op.create_table(
+            "chunks",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("document_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("documents.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("idx", sa.Integer(), nullable=False),
+            sa.Column("text", sa.Text(), nullable=False),
+            sa.Column("page", sa.Integer(), nullable=True),
+            sa.Column("section_path", sa.String(), nullable=True),
+            sa.Column("hash", sa.String(), nullable=False),
+        )
+    if "conflicts" not in existing:
+        op.create_table(
+            "conflicts",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("new_chunk_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("chunks.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("existing_chunk_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("chunks.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("label", sa.String(), nullable=False),
+            sa.Column("score", sa.Float(), nullable=True),
+            sa.Column("neighbor_sim", sa.Float(), nullable=True),
+            sa.Column("judged_by", sa.String(), nullable=True),
+            sa.Column("resolved_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("resolution_action", sa.String(), nullable=True),
+            sa.Column("resolver_note", sa.Text(), nullable=True),
+            _created_at(),
+        )
+    if "chat_sessions" not in existing:
+        op.create_table(
+            "chat_sessions",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("name", sa.String(), nullable=True),
+            _created_at(),
+            sa.Column("summary", sa.Text(), nullable=True),
+            sa.Column("summary_upto", sa.DateTime(timezone=True), nullable=True),
+        )
+    if "chat_messages" not in existing:
+        op.create_table(
+            "chat_messages",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("session_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("role", sa.String(), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            _created_at(),
+        )
+    if "embedding_cache" not in existing:
+        op.create_table(
+            "embedding_cache",
+            sa.Column("model", sa.String(), primary_key=True),
+            sa.Column("hash", sa.String(), primary_key=True),
+            sa.Column("vector", sa.LargeBinary(), nullable=False),
+            _created_at(),
+        )
+    if "pair_verdicts" not in existing:
+        op.create_table(
+            "pair_verdicts",
+            sa.Column("new_hash", sa.String(), primary_key=True),
+            sa.Column("existing_hash", sa.String(), primary_key=True),
+            sa.Column("model_key", sa.String(), primary_key=True),
+            sa.Column("label", sa.String(), nullable=False),
+            sa.Column("score", sa.Float(), nullable=True),
+            sa.Column("judged_by", sa.String(), nullable=False),
+            sa.Column("reasoning", sa.Text(), nullable=True),
+            _created_at(),
+        )
+    if "publish_jobs" not in existing:
+        op.create_table(
+            "publish_jobs",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("document_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("documents.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("docling", sa.Boolean(), nullable=False),
+            sa.Column("batch_id", postgresql.UUID(as_uuid=True), nullable=True),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("checkpoint", sa.String(), nullable=True),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("max_attempts", sa.Integer(), nullable=False),
+            sa.Column("last_event", postgresql.JSONB(), nullable=True),
+            sa.Column("event_seq", sa.Integer(), nullable=False),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("worker_id", sa.String(), nullable=True),
+            sa.Column("run_after", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+            _created_at(),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+    if "corpus_state" not in existing:
+        op.create_table(
+            "corpus_state",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+
+    for statement in LEGACY_PATCHES:
+        op.execute(statement)
+
+def downgrade():
+    for table in ("corpus_state", "publish_jobs", "pair_verdicts", "embedding_cache", "chat_messages", "chat_sessions", "conflicts", "chunks", "documents"):
+        op.drop_table(table)
@@ -0,0 +1,84 @@
+"""hot path indexes
+
+Indexes for the per-document chunk queries, the document dedup lookups, the
+chunk -> conflict joins (and ON DELETE CASCADE of chunks), the resolved
+conflict listing, chat history and the publish job queue, plus the
+uq_conflicts_pair constraint (conflicts.new_chunk_id is its leading column).
+
+Built with CREATE INDEX CONCURRENTLY outside the migration transaction, so
+writes keep flowing while a large table is indexed. The pair constraint is
+attached to its concurrently built unique index, which only takes a brief lock.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_chat_messages_session_created", "chat_messages", ["session_id", "created_at"], {}),
+    ("ix_chunks_document_idx", "chunks", ["document_id", "idx"], {}),
+    ("ix_documents_external_ref", "documents", ["external_ref"], {}),
+    ("ix_documents_file_hash", "documents", ["file_hash"], {}),
+    ("ix_conflicts_existing_chunk_id", "conflicts", ["existing_chunk_id"], {}),
+    ("ix_conflicts_unresolved_created", "conflicts", ["created_at", "id"], {"postgresql_where": sa.text("resolved_at IS NULL")}),
+    ("ix_conflicts_resolved_created", "conflicts", ["created_at", "id"], {"postgresql_where": sa.text("resolved_at IS NOT NULL")}),
+    ("ix_publish_jobs_document_id", "publish_jobs", ["document_id"], {}),
+    ("ix_publish_jobs_batch_id", "publish_jobs", ["batch_id"], {}),
+    ("ix_publish_jobs_runnable", "publish_jobs", ["created_at"], {"postgresql_where": sa.text("status IN ('queued', 'running')")}),
+]
+
+# Duplicate pairs stored before the constraint existed would fail the unique build
+DEDUP_CONFLICT_PAIRS = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_conflicts_pair') THEN
+        DELETE FROM conflicts a USING conflicts b
+        WHERE a.new_chunk_id = b.new_chunk_id AND a.existing_chunk_id = b.existing_chunk_id AND a.ctid > b.ctid;
+    END IF;
+END $$
+"""
+
+ATTACH_CONFLICT_PAIR = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_conflicts_pair') THEN
+        ALTER TABLE conflicts ADD CONSTRAINT uq_conflicts_pair UNIQUE USING INDEX uq_conflicts_pair;
+    END IF;
+END $$
+"""
+
+def _drop_if_invalid(name: str):
+    # An interrupted CONCURRENTLY build leaves an INVALID index behind that IF NOT EXISTS would keep
+    invalid = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name AND NOT i.indisvalid"),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, kw in INDEXES:
+            if not op.get_context().as_sql:
+                _drop_if_invalid(name)
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+        op.execute(DEDUP_CONFLICT_PAIRS)
+        if not op.get_context().as_sql:
+            _drop_if_invalid("uq_conflicts_pair")
+        op.create_index("uq_conflicts_pair", "conflicts", ["new_chunk_id", "existing_chunk_id"], unique=True,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.execute(ATTACH_CONFLICT_PAIR)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_constraint("uq_conflicts_pair", "conflicts", type_="unique")
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
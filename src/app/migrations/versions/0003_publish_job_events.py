@@ -0,0 +1,29 @@
+"""publish job event log
+
+Every progress event of a publish job, so /publish-stream can relay all of
+them instead of only the latest one per poll.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "publish_job_events",
+        sa.Column("job_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("publish_jobs.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("seq", sa.Integer(), primary_key=True),
+        sa.Column("event", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("publish_job_events")
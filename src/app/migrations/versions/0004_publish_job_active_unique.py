@@ -0,0 +1,44 @@
+"""one active publish job per document
+
+A partial unique index on publish_jobs(document_id) over queued/running jobs,
+so two concurrent enqueues of the same document cannot both insert a job.
+Extra active jobs left by that race before the index existed are failed first
+(the oldest one is kept). Built concurrently like the indexes of 0002.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEX = "uq_publish_jobs_active_document"
+
+FAIL_DUPLICATE_ACTIVE_JOBS = """
+UPDATE publish_jobs j SET status = 'failed', error = 'Duplicate of an earlier publish job', finished_at = now()
+FROM publish_jobs k
+WHERE j.document_id = k.document_id AND j.status IN ('queued', 'running') AND k.status IN ('queued', 'running')
+  AND (j.created_at, j.id) > (k.created_at, k.id)
+"""
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute(FAIL_DUPLICATE_ACTIVE_JOBS)
+        if not op.get_context().as_sql:
+            invalid = op.get_bind().execute(
+                sa.text("SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name AND NOT i.indisvalid"),
+                {"name": INDEX},
+            ).scalar()
+            if invalid:
+                op.drop_index(INDEX, postgresql_concurrently=True, if_exists=True)
+        op.create_index(INDEX, "publish_jobs", ["document_id"], unique=True, postgresql_concurrently=True, if_not_exists=True,
+                        postgresql_where=sa.text("status IN ('queued', 'running')"))
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(INDEX, table_name="publish_jobs", postgresql_concurrently=True, if_exists=True)
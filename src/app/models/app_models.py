@@ -1,16 +1,16 @@
-from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, Float
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, Float, LargeBinary, Boolean, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func, text
 import uuid
 from ..database import Base
 
 class Document(Base):
     __tablename__ = "documents"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    external_ref = Column(String, nullable=True)  # e.g., filename
+    external_ref = Column(String, nullable=True, index=True)  # e.g., filename
     title = Column(String, nullable=True)
     status = Column(String, nullable=False, default="draft")  # draft/published/archived
-    file_hash = Column(String, nullable=True)  # fingerprint for dedup
+    file_hash = Column(String, nullable=True, index=True)  # fingerprint for dedup
     storage_key = Column(String, nullable=True)  # object storage key
     extension = Column(String, nullable=True)  # e.g., pdf, txt
     effective_at = Column(DateTime(timezone=True), nullable=True)
@@ -26,6 +26,10 @@ class Chunk(Base):
     section_path = Column(String, nullable=True)
     hash = Column(String, nullable=False)
 
+    __table_args__ = (
+        Index("ix_chunks_document_idx", "document_id", "idx"),
+    )
+
 class Conflict(Base):
     __tablename__ = "conflicts"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -38,12 +42,25 @@ class Conflict(Base):
     resolved_at = Column(DateTime(timezone=True), nullable=True)
     resolution_action = Column(String, nullable=True)  # supersede|ignore
     resolver_note = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # One row per (new, existing) pair; conflict inserts rely on it for ON CONFLICT DO NOTHING
+        UniqueConstraint("new_chunk_id", "existing_chunk_id", name="uq_conflicts_pair"),
+        # Keyset pagination of the review queue (and of resolved conflicts)
+        Index("ix_conflicts_unresolved_created", "created_at", "id", postgresql_where=text("resolved_at IS NULL")),
+        Index("ix_conflicts_resolved_created", "created_at", "id", postgresql_where=text("resolved_at IS NOT NULL")),
+        # Joins from chunks and ON DELETE CASCADE; new_chunk_id leads uq_conflicts_pair
+        Index("ix_conflicts_existing_chunk_id", "existing_chunk_id"),
+    )
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    summary = Column(Text, nullable=True)  # rolling summary of turns that no longer fit the history budget
+    summary_upto = Column(DateTime(timezone=True), nullable=True)  # created_at of the last summarized message
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
@@ -52,3 +69,64 @@ class ChatMessage(Base):
     role = Column(String, nullable=False)  # user|assistant|system
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_chat_messages_session_created", "session_id", "created_at"),
+    )
+
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+    model = Column(String, primary_key=True)  # embed model name
+    hash = Column(String, primary_key=True)  # Chunk.hash (xxh64 of text)
+    vector = Column(LargeBinary, nullable=False)  # float32 bytes
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class PairVerdict(Base):
+    __tablename__ = "pair_verdicts"
+    new_hash = Column(String, primary_key=True)  # Chunk.hash of the new chunk
+    existing_hash = Column(String, primary_key=True)  # Chunk.hash of the neighbour
+    model_key = Column(String, primary_key=True)  # NLI model name or LLM model@prompt version
+    label = Column(String, nullable=False)  # entailment/neutral/contradiction
+    score = Column(Float, nullable=True)
+    judged_by = Column(String, nullable=False)  # nli|llm
+    reasoning = Column(Text, nullable=True)  # JSON, LLM verdicts only
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class PublishJob(Base):
+    __tablename__ = "publish_jobs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    docling = Column(Boolean, nullable=False, default=False)
+    batch_id = Column(UUID(as_uuid=True), nullable=True, index=True)  # bulk upload the job belongs to
+    status = Column(String, nullable=False, default="queued")  # queued/running/succeeded/failed
+    checkpoint = Column(String, nullable=True)  # last durable stage: chunked/embedded
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    last_event = Column(JSONB, nullable=True)  # latest progress event
+    event_seq = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    worker_id = Column(String, nullable=True)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # claim_next scans only the queued/running jobs
+        Index("ix_publish_jobs_runnable", "created_at", postgresql_where=text("status IN ('queued', 'running')")),
+        # At most one queued/running job per document (enqueue_publish relies on it)
+        Index("uq_publish_jobs_active_document", "document_id", unique=True, postgresql_where=text("status IN ('queued', 'running')")),
+    )
+
+class PublishJobEvent(Base):
+    __tablename__ = "publish_job_events"
+    job_id = Column(UUID(as_uuid=True), ForeignKey("publish_jobs.id", ondelete="CASCADE"), primary_key=True)
+    seq = Column(Integer, primary_key=True)  # PublishJob.event_seq the event was recorded as
+    event = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class CorpusState(Base):
+    __tablename__ = "corpus_state"
+    id = Column(Integer, primary_key=True, default=1)  # single row
+    version = Column(Integer, nullable=False, default=0)  # bumped whenever the searchable corpus changes
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
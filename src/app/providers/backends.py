@@ -0,0 +1,62 @@
+import os
+import shutil
+import logging
+import tempfile
+
+from ..config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BACKENDS = ["torch", "onnx"]
+QUANTIZATIONS = ["", "arm64", "avx2", "avx512", "avx512_vnni"]
+
+def load_model(factory, model_name: str, *, backend: str, quantization: str = ""):
+    """
+    Load a SentenceTransformer or CrossEncoder (`factory`) on the given inference backend.
+
+    - torch: the regular PyTorch model.
+    - onnx: ONNX Runtime; exported from the Hub checkpoint when no ONNX file is published.
+    - onnx + quantization: dynamically int8-quantized ONNX model for the given CPU
+      target, exported once into `settings.onnx_model_dir` and reused afterwards.
+      The export is written to a temporary directory and renamed into place, so
+      processes starting together never load a half-written model.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported inference backend: {backend}")
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unsupported ONNX quantization: {quantization}")
+
+    if backend == "torch":
+        return factory(model_name)
+    if not quantization:
+        return factory(model_name, backend="onnx")
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    local_dir = os.path.join(settings.onnx_model_dir, model_name.replace("/", "__"), quantization)
+    file_name = f"onnx/model_qint8_{quantization}.onnx"
+    if not os.path.exists(os.path.join(local_dir, file_name)):
+        logger.info(f"Exporting int8 ({quantization}) ONNX model for {model_name} to {local_dir}")
+        os.makedirs(os.path.dirname(local_dir), exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".export-", dir=os.path.dirname(local_dir))
+        try:
+            model = factory(model_name, backend="onnx")
+            model.save_pretrained(tmp_dir)
+            export_dynamic_quantized_onnx_model(model, quantization, tmp_dir)
+            try:
+                os.replace(tmp_dir, local_dir)
+            except OSError:
+                # Another process finished the same export first, use its copy
+                if not os.path.exists(os.path.join(local_dir, file_name)):
+                    raise
+                logger.info(f"{local_dir} was exported concurrently, discarding this export")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return factory(local_dir, backend="onnx", model_kwargs={"file_name": file_name})
+
+def model_key(model_name: str, *, backend: str, quantization: str = "") -> str:
+    """Identifies a model together with its backend; used to key cached outputs."""
+    if backend == "torch":
+        return model_name
+    return f"{model_name}@{backend}{'-' + quantization if quantization else ''}"
@@ -0,0 +1,240 @@
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.app_models import CorpusState, EmbeddingCacheEntry, PairVerdict
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Max keys per IN (...) lookup / rows per INSERT
+DB_BATCH_SIZE = 1000
+
+class LRUTier:
+    """Thread-safe, size-bounded in-process LRU map."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys) -> tuple[dict, list]:
+        """Returns (hits, missing keys)."""
+        found = {}
+        missing = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                value = self._items.get(key)
+                if value is None:
+                    missing.append(key)
+                else:
+                    self._items.move_to_end(key)
+                    found[key] = value
+        return found, missing
+
+    def put_many(self, items: dict):
+        with self._lock:
+            for key, value in items.items():
+                self._items[key] = value
+                self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by (embed model, chunk hash).
+    A bounded in-process LRU sits in front of the durable `embedding_cache` table.
+    """
+
+    def __init__(self, model_name: str | None = None, max_entries: int | None = None):
+        self.model_name = model_name or settings.embed_model
+        self._lru = LRUTier(max_entries or settings.embed_cache_lru_size)
+
+    def get_many(self, hashes: list[str]) -> dict[str, np.ndarray]:
+        found, missing = self._lru.get_many(hashes)
+        if missing:
+            s = SessionLocal()
+            try:
+                loaded = {}
+                for start in range(0, len(missing), DB_BATCH_SIZE):
+                    rows = s.query(EmbeddingCacheEntry.hash, EmbeddingCacheEntry.vector).filter(
+                        EmbeddingCacheEntry.model == self.model_name,
+                        EmbeddingCacheEntry.hash.in_(missing[start:start + DB_BATCH_SIZE]),
+                    ).all()
+                    for h, blob in rows:
+                        loaded[h] = np.frombuffer(blob, dtype=np.float32)
+                self._lru.put_many(loaded)
+                found.update(loaded)
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed: {e}")
+            finally:
+                s.close()
+
+        logger.info(f"Embedding cache: {len(found)} hits, {len(set(hashes)) - len(found)} misses")
+        return found
+
+    def put_many(self, vectors: dict[str, np.ndarray]):
+        if not vectors:
+            return
+        vectors = {h: np.asarray(v, dtype=np.float32) for h, v in vectors.items()}
+        self._lru.put_many(vectors)
+        rows = [{"model": self.model_name, "hash": h, "vector": v.tobytes()} for h, v in vectors.items()]
+        s = SessionLocal()
+        try:
+            for start in range(0, len(rows), DB_BATCH_SIZE):
+                s.execute(insert(EmbeddingCacheEntry).values(rows[start:start + DB_BATCH_SIZE]).on_conflict_do_nothing())
+            s.commit()
+        except Exception as e:
+            s.rollback()
+            logger.warning(f"Embedding cache write failed: {e}")
+        finally:
+            s.close()
+
+class VerdictCache:
+    """
+    Persistent cache of conflict verdicts keyed by (new chunk hash, neighbour hash, model key).
+    The model key is the NLI model name or the LLM model plus prompt version, so
+    changing either invalidates old verdicts. Verdicts are dicts with
+    `label`, `score`, `judged_by` and, for the LLM, `reasoning`.
+    """
+
+    def __init__(self, max_entries: int | None = None):
+        self._lru = LRUTier(max_entries or settings.verdict_cache_lru_size)
+
+    def get_many(self, pairs: list[tuple[str, str]], model_key: str) -> dict[tuple[str, str], dict]:
+        found, missing = self._lru.get_many((a, b, model_key) for a, b in pairs)
+        found = {(a, b): verdict for (a, b, _), verdict in found.items()}
+        if missing:
+            s = SessionLocal()
+            try:
+                loaded = {}
+                for start in range(0, len(missing), DB_BATCH_SIZE):
+                    rows = s.query(PairVerdict).filter(
+                        PairVerdict.model_key == model_key,
+                        tuple_(PairVerdict.new_hash, PairVerdict.existing_hash).in_(
+                            [(a, b) for a, b, _ in missing[start:start + DB_BATCH_SIZE]]
+                        ),
+                    ).all()
+                    for row in rows:
+                        loaded[(row.new_hash, row.existing_hash, model_key)] = {
+                            "label": row.label,
+                            "score": row.score,
+                            "judged_by": row.judged_by,
+                            "reasoning": json.loads(row.reasoning) if row.reasoning else None,
+                        }
+                self._lru.put_many(loaded)
+                found.update({(a, b): verdict for (a, b, _), verdict in loaded.items()})
+            except Exception as e:
+                logger.warning(f"Verdict cache lookup failed: {e}")
+            finally:
+                s.close()
+        return found
+
+    def put_many(self, verdicts: dict[tuple[str, str], dict], model_key: str):
+        if not verdicts:
+            return
+        self._lru.put_many({(a, b, model_key): verdict for (a, b), verdict in verdicts.items()})
+        rows = [
+            {
+                "new_hash": a,
+                "existing_hash": b,
+                "model_key": model_key,
+                "label": verdict["label"],
+                "score": verdict.get("score"),
+                "judged_by": verdict["judged_by"],
+                "reasoning": json.dumps(verdict["reasoning"]) if verdict.get("reasoning") is not None else None,
+            }
+            for (a, b), verdict in verdicts.items()
+        ]
+        s = SessionLocal()
+        try:
+            for start in range(0, len(rows), DB_BATCH_SIZE):
+                s.execute(insert(PairVerdict).values(rows[start:start + DB_BATCH_SIZE]).on_conflict_do_nothing())
+            s.commit()
+        except Exception as e:
+            s.rollback()
+            logger.warning(f"Verdict cache write failed: {e}")
+        finally:
+            s.close()
+
+def corpus_version(session=None) -> int:
+    """Current corpus version (0 before the first change)."""
+    s = session or SessionLocal()
+    try:
+        return s.query(CorpusState.version).filter(CorpusState.id == 1).scalar() or 0
+    finally:
+        if session is None:
+            s.close()
+
+def bump_corpus_version(session):
+    """
+    Mark the searchable corpus as changed (publish, delete, conflict resolution).
+    Runs in the caller's transaction, so the bump commits together with the change.
+    """
+    session.execute(
+        insert(CorpusState)
+        .values(id=1, version=1)
+        .on_conflict_do_update(index_elements=[CorpusState.id], set_={"version": CorpusState.version + 1})
+    )
+
+class SemanticCache:
+    """
+    In-process semantic cache of chat answers.
+
+    Entries are keyed by the normalized embedding of the (refined) query and
+    scoped by chat provider and corpus version. A lookup hits the most similar
+    entry at or above `chat_cache_similarity` that is younger than
+    `chat_cache_ttl_seconds`. Entries of older corpus versions are dropped as
+    soon as a newer version is seen; the oldest entries are evicted beyond
+    `chat_cache_max_entries`.
+    """
+
+    def __init__(self, max_entries: int | None = None):
+        self.max_entries = max_entries or settings.chat_cache_max_entries
+        self._entries = OrderedDict()  # id -> (provider, version, created, vector, value)
+        self._version = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _sync_version(self, version: int):
+        if version != self._version:
+            if self._entries:
+                logger.info(f"Corpus version {self._version} -> {version}, dropping {len(self._entries)} cached answers")
+            self._entries.clear()
+            self._version = version
+
+    def get(self, vector, provider: str, version: int) -> dict | None:
+        vector = np.asarray(vector, dtype=np.float32)
+        expired_before = time.time() - settings.chat_cache_ttl_seconds
+        with self._lock:
+            self._sync_version(version)
+            for key in [k for k, entry in self._entries.items() if entry[2] < expired_before]:
+                del self._entries[key]
+            candidates = [(key, entry) for key, entry in self._entries.items() if entry[0] == provider]
+            if not candidates:
+                return None
+            sims = np.stack([entry[3] for _, entry in candidates]) @ vector
+            best = int(np.argmax(sims))
+            if sims[best] < settings.chat_cache_similarity:
+                return None
+            key, entry = candidates[best]
+            self._entries.move_to_end(key)
+            return {**entry[4], "similarity": float(sims[best])}
+
+    def put(self, vector, provider: str, version: int, value: dict):
+        with self._lock:
+            self._sync_version(max(version, self._version))
+            if version != self._version:
+                return  # answered against an older corpus
+            self._entries[self._next_id] = (provider, version, time.time(), np.asarray(vector, dtype=np.float32), value)
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -1,15 +1,54 @@
 import logging
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 
 from ..config import settings
+from .backends import load_model, model_key
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class EmbeddingsProvider:
-    def __init__(self):
-        logger.info(f"Initializing EmbeddingsProvider with model: {settings.embed_model}")
-        self.model = SentenceTransformer(settings.embed_model)
+    def __init__(self, backend: str | None = None, quantization: str | None = None):
+        backend = backend or settings.embed_backend
+        quantization = settings.embed_onnx_quantization if quantization is None else quantization
+        logger.info(f"Initializing EmbeddingsProvider with model: {settings.embed_model} ({backend}{', ' + quantization if quantization else ''})")
+        if settings.embed_num_threads > 0:
+            torch.set_num_threads(settings.embed_num_threads)
+        self.model_key = model_key(settings.embed_model, backend=backend, quantization=quantization)
+        self.model = load_model(SentenceTransformer, settings.embed_model, backend=backend, quantization=quantization)
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
 
     def embed_text(self, texts: list[str]) -> list[list[float]]:
         return self.model.encode(texts, normalize_embeddings=True).tolist()
+
+    def embed_batch(self, texts: list[str], batch_size: int | None = None) -> np.ndarray:
+        """
+        Embed many texts at once.
+        Inputs are sorted by token length so each batch pads to a similar length,
+        encoded in batches of `batch_size`, and returned in the original order as
+        one contiguous float32 matrix of shape (len(texts), dim).
+        """
+        batch_size = batch_size or settings.embed_batch_size
+        dim = self.dimension
+        if not texts:
+            return np.empty((0, dim), dtype=np.float32)
+
+        # Token lengths (no special tokens / truncation) drive the bucketing
+        lengths = [len(ids) for ids in self.model.tokenizer(texts, add_special_tokens=False, truncation=False)["input_ids"]]
+        order = np.argsort(lengths, kind="stable")
+
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            out[idx] = self.model.encode(
+                [texts[i] for i in idx],
+                batch_size=len(idx),
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+            )
+        return np.ascontiguousarray(out)
@@ -11,10 +11,18 @@ from langfuse import Langfuse, get_client
 from langfuse.langchain import CallbackHandler
 from ..config import settings
 from ..models.app_models import Document
-from .qdrant_client import QdrantProvider
+from .cache import VerdictCache
 from ..providers.app_context import AppContext
 from . import prompts
 
+def merge_hits(primary: list, extra: list, top_k: int) -> list:
+    """Union of two Qdrant result lists by point id (keeping the higher score), top_k by score."""
+    best = {}
+    for hit in [*primary, *extra]:
+        if hit.id not in best or hit.score > best[hit.id].score:
+            best[hit.id] = hit
+    return sorted(best.values(), key=lambda hit: hit.score, reverse=True)[:top_k]
+
 class LLMProvider:
     available_providers = ["gemini", "vllm", "openai"]
 
@@ -49,15 +57,18 @@ class LLMProvider:
             api_key=settings.openai_api_key,
             callbacks=[CallbackHandler(public_key=settings.langfuse_public_key)]
         )
-        self.qdrant_client = QdrantProvider()
+        from .registry import get_qdrant
+        self.qdrant_client = get_qdrant()
         self.ctx = None
+        # In-flight summary per session; holding the task also keeps it from being garbage collected
+        self._summary_tasks: dict[str, asyncio.Task] = {}
 
 
     def init_tenant(self, context: AppContext, db: Session):
         self.control_db = db
         self.ctx = context
 
-    def _route(self, query: str, chat_history: list = None) -> tuple[str, str]:
+    async def _route(self, query: str, chat_history: list = None, summary: str | None = None) -> tuple[str, str]:
         """
         Decide if query needs RAG or not, and refine query if RAG is chosen.
         Returns: (route_decision, refined_query)
@@ -78,8 +89,10 @@ class LLMProvider:
             conversation_context = "\n".join(context_lines)
         else:
             conversation_context = "No previous conversation."
+        if summary:
+            conversation_context = f"Summary of earlier conversation: {summary}\n{conversation_context}"
         
-        resp = self.conflict_llm.invoke([("system", prompts.router_prompt.format(
+        resp = await self.conflict_llm.ainvoke([("system", prompts.router_prompt.format(
             conversation_context=conversation_context,
             query=query
         ))])
@@ -116,10 +129,28 @@ class LLMProvider:
             else:
                 return "direct", query
     
-    async def predict_conflict(self, llm: ChatGroq, chunk1: str, chunk2: str, semaphore: asyncio.Semaphore, conflict_payload: dict) -> dict:
+    async def predict_conflict(self, llm: ChatGroq, chunk1: str, chunk2: str, semaphore: asyncio.Semaphore, conflict_payload: dict,
+                               verdict_cache: VerdictCache | None = None, pair_key: tuple[str, str] | None = None) -> dict:
         """
         Wrapper for the LLM call to format the output.
+        If a verdict cache and the pair's chunk hashes are given, a cached verdict
+        for the same model and prompt version is returned without calling the LLM.
         """
+        from ..services.executors import run_io
+
+        model_key = f"{llm.model_name}@{prompts.conflict_prompt_version}"
+        if verdict_cache and pair_key:
+            cached = (await run_io(verdict_cache.get_many, [pair_key], model_key)).get(pair_key)
+            if cached:
+                return {
+                    "label": cached["label"],
+                    "payload": {
+                        **conflict_payload,
+                        "judged_by": cached["judged_by"],
+                        "reasoning": cached["reasoning"]
+                    }
+                }
+
         messages = [
             ("system", prompts.conflict_sys_prompt.template),
             ("human", f"Chunk 1: \"{chunk1}\"\n\nChunk 2: \"{chunk2}\"")
@@ -137,6 +168,13 @@ class LLMProvider:
                 output = response.content.strip()
                 output_json = json.loads(repair_json(output))
 
+                if verdict_cache and pair_key:
+                    await run_io(verdict_cache.put_many, {pair_key: {
+                        "label": output_json["label"],
+                        "judged_by": "llm",
+                        "reasoning": output_json["reasoning"]
+                    }}, model_key)
+
                 return {
                     "label": output_json["label"],
                     "payload": {
@@ -151,7 +189,7 @@ class LLMProvider:
             finally:
                 client.flush()
 
-    def generate_gemini(self, messages: list) -> str:
+    async def generate_gemini(self, messages: list) -> str:
         """
         Generate a response using the Gemini LLM.
         """
@@ -159,7 +197,7 @@ class LLMProvider:
             public_key=settings.langfuse_public_key,
         )
         try:
-            response = self.gemini_llm.invoke(messages)
+            response = await self.gemini_llm.ainvoke(messages)
             return response.content.strip()
         except Exception as e:
             print(f"Gemini LLM error: {e}")
@@ -167,7 +205,7 @@ class LLMProvider:
         finally:
             client.flush()
         
-    def generate_openai(self, messages: list) -> str:
+    async def generate_openai(self, messages: list) -> str:
         """
         Generate a response using the OpenAI LLM.
         """
@@ -175,7 +213,7 @@ class LLMProvider:
             public_key=settings.langfuse_public_key,
         )
         try:
-            response = self.openai_llm.invoke(messages)
+            response = await self.openai_llm.ainvoke(messages)
             return response.content.strip()
         except Exception as e:
             print(f"OpenAI LLM error: {e}")
@@ -183,92 +221,307 @@ class LLMProvider:
         finally:
             client.flush()
     
-    def generate_response(self, content: str, provider: str, session_id: str = None) -> tuple[str, list]:
+    def _chat_history(self, session_id: str) -> dict:
         """
-        Generate response (RAG or direct) using specified provider with chat history.
+        Chat history for the next turn, within `chat_history_token_budget`.
+
+        Only the last `chat_history_max_messages` messages after the session's
+        summary are fetched (indexed on session_id, created_at). Whole turns are
+        kept newest first while they fit the budget. Everything older that is not
+        summarized yet, whether over the budget or beyond the fetch window, ends at
+        `overflow_upto` and is folded into the rolling summary.
         """
+        from ..models.app_models import ChatMessage, ChatSession
+        from ..services.chunking import token_len
         s = self.ctx.get_db_session()
+        try:
+            summary, summary_upto = s.query(ChatSession.summary, ChatSession.summary_upto).filter(ChatSession.id == session_id).first() or (None, None)
+            query = s.query(ChatMessage.role, ChatMessage.content, ChatMessage.created_at).filter(ChatMessage.session_id == session_id)
+            if summary_upto:
+                query = query.filter(ChatMessage.created_at > summary_upto)
+            # A turn's user and assistant messages share created_at (same transaction); "user" sorts after "assistant".
+            # One extra row tells whether older unsummarized messages exist beyond the window.
+            recent_messages = query.order_by(ChatMessage.created_at.desc(), ChatMessage.role.asc()).limit(settings.chat_history_max_messages + 1).all()
+        finally:
+            self.ctx.close_session(s)
+
+        kept, used = [], 0
+        for msg in recent_messages[:settings.chat_history_max_messages]:
+            used += token_len(msg.content)
+            if used > settings.chat_history_token_budget:
+                break
+            kept.append(msg)
+        # Never split a turn: drop kept messages that share created_at with the first dropped one
+        dropped = recent_messages[len(kept):]
+        if dropped:
+            kept = [msg for msg in kept if msg.created_at != dropped[0].created_at]
+            dropped = recent_messages[len(kept):]
+
+        roles = {"user": "human", "assistant": "assistant"}
+        return {
+            "history": [(roles[msg.role], msg.content) for msg in reversed(kept) if msg.role in roles],
+            "summary": summary,
+            "summary_upto": summary_upto,
+            "overflow_upto": dropped[0].created_at if dropped else None,
+        }
+
+    def _summary_batch(self, session_id: str, after, upto) -> tuple[list[tuple[str, str]], object]:
+        """
+        Oldest unsummarized messages in (after, upto], whole turns up to `chat_summary_batch_tokens`.
+        Returns the messages and the created_at they reach; the rest is folded in on a later turn.
+        """
+        from ..models.app_models import ChatMessage
+        from ..services.chunking import token_len
+        s = self.ctx.get_db_session()
+        try:
+            query = s.query(ChatMessage.role, ChatMessage.content, ChatMessage.created_at).filter(
+                ChatMessage.session_id == session_id, ChatMessage.created_at <= upto
+            )
+            if after:
+                query = query.filter(ChatMessage.created_at > after)
+            batch, used = [], 0
+            for msg in query.order_by(ChatMessage.created_at.asc(), ChatMessage.role.desc()).yield_per(100):
+                used += token_len(msg.content)
+                if used > settings.chat_summary_batch_tokens and batch and msg.created_at != batch[-1].created_at:
+                    break
+                batch.append(msg)
+        finally:
+            self.ctx.close_session(s)
+        roles = {"user": "human", "assistant": "assistant"}
+        return [(roles[msg.role], msg.content) for msg in batch if msg.role in roles], batch[-1].created_at if batch else None
+
+    def _schedule_summary(self, session_id: str, summary: str | None, summary_upto, overflow_upto):
+        """Start folding older turns into the summary in the background, unless this session already has a summary in flight."""
+        running = self._summary_tasks.get(session_id)
+        if running and not running.done():
+            return
+        task = asyncio.ensure_future(self._summarize_history(session_id, summary, summary_upto, overflow_upto))
+        self._summary_tasks[session_id] = task
+
+        def forget(done):
+            if self._summary_tasks.get(session_id) is done:
+                del self._summary_tasks[session_id]
+        task.add_done_callback(forget)
+
+    async def _summarize_history(self, session_id: str, summary: str | None, summary_upto, overflow_upto):
+        """Fold turns that fell out of the history window into the session's rolling summary."""
+        from ..models.app_models import ChatSession
+        from ..services.executors import run_io
+        try:
+            overflow, upto = await run_io(self._summary_batch, session_id, summary_upto, overflow_upto)
+            if not overflow:
+                return
+            lines = [f"{'User' if role == 'human' else 'Assistant'}: {content}" for role, content in overflow]
+            resp = await self.conflict_llm.ainvoke([("human", prompts.history_summary_prompt.format(
+                summary=summary or "(none)",
+                messages="\n".join(lines),
+                max_words=int(settings.chat_summary_max_tokens * 0.75),
+            ))])
+            new_summary = resp.content.strip()
+        except Exception as e:
+            print(f"History summary error: {e}")
+            return
+
+        def store():
+            s = self.ctx.get_db_session()
+            try:
+                # Only if no other turn (or process) moved the summary on since it was read
+                updated = s.query(ChatSession).filter(
+                    ChatSession.id == session_id,
+                    ChatSession.summary_upto.is_not_distinct_from(summary_upto),
+                ).update({"summary": new_summary, "summary_upto": upto}, synchronize_session=False)
+                s.commit()
+                return updated
+            finally:
+                self.ctx.close_session(s)
+        if not await run_io(store):
+            print(f"Summary of session {session_id} changed concurrently, discarding this one")
+
+    def _doc_titles(self, doc_ids: set[str]) -> dict[str, str]:
+        s = self.ctx.get_db_session()
+        try:
+            return {str(doc_id): title for doc_id, title in s.query(Document.id, Document.title).filter(Document.id.in_(doc_ids)).all()}
+        finally:
+            self.ctx.close_session(s)
+
+    async def _prepare_messages(self, content: str, provider: str, session_id: str = None) -> tuple[list, list, str | None, tuple | None]:
+        """
+        Route the query and build the prompt (with retrieval for RAG).
+        Returns (messages, sources, canned_answer, cache_key); `canned_answer` is set when there is
+        nothing to ask the LLM (including semantic cache hits), `cache_key` when the answer should be cached.
+        """
+        from ..services.executors import run_io
+        from .registry import get_embeddings, get_router, get_chat_cache
+        from .cache import corpus_version
         chunks = []  # Initialize chunks
+        cache_key = None
 
-        # Get chat history for context
-        chat_history = []
-        if session_id:
-            from ..models.app_models import ChatMessage
-            recent_messages = s.query(ChatMessage)\
-                .filter(ChatMessage.session_id == session_id)\
-                .order_by(ChatMessage.created_at.asc())\
-                .all()
-            
-            # Add all previous messages in order
-            for msg in recent_messages:
-                if msg.role == "user":
-                    chat_history.append(("human", msg.content))
-                elif msg.role == "assistant":
-                    chat_history.append(("assistant", msg.content))
-
-        # 1) Routing Decision - pass chat history for context and get refined query
-        route, refined_query = self._route(content, chat_history)
-        print(f"Router decision: {route}")
-        if route == "rag":
-            print(f"Using refined query for retrieval: {refined_query}")
+        # Chat history and the query embedding are fetched concurrently
+        empty_history = {"history": [], "summary": None, "summary_upto": None, "overflow_upto": None}
+        history_task = asyncio.ensure_future(run_io(self._chat_history, session_id) if session_id else asyncio.sleep(0, result=empty_history))
+        query_vector = await run_io(get_embeddings().embed_text, content)
+
+        speculative = None
+        route, refined_query = None, content
+        try:
+            history = await history_task
+            chat_history, summary = history["history"], history["summary"]
+            if history["overflow_upto"] and settings.chat_summary_enabled:
+                # Off the critical path; this turn still has the previous summary
+                self._schedule_summary(session_id, summary, history["summary_upto"], history["overflow_upto"])
+
+            # 1) Routing Decision - local embedding router first, LLM router (with query refinement) when it is unsure
+            router = get_router()
+            if router and (not (chat_history or summary) or settings.local_router_with_history):
+                route = router.route(query_vector)
+            if route is None:
+                # Speculative retrieval on the raw query, overlapping with the LLM router call
+                if settings.speculative_retrieval:
+                    speculative = asyncio.ensure_future(self.qdrant_client.aget_relevant_chunks(
+                        content, top_k=settings.top_k_neighbors, query_vector=query_vector
+                    ))
+                route, refined_query = await self._route(content, chat_history, summary)
+            print(f"Router decision: {route}")
+            if route == "rag":
+                print(f"Using refined query for retrieval: {refined_query}")
+                refined_vector = None
+                chat_cache = get_chat_cache()
+                if chat_cache:
+                    # Keyed by the refined query, scoped to the provider and current corpus version
+                    refined_vector = query_vector if refined_query.strip() == content.strip() else await run_io(get_embeddings().embed_text, refined_query)
+                    version = await run_io(corpus_version)
+                    cached = chat_cache.get(refined_vector, provider, version)
+                    if cached:
+                        print(f"Semantic cache hit (similarity {cached['similarity']:.3f})")
+                        return [], cached["sources"], cached["answer"], None
+                    cache_key = (refined_vector, version)
+                if refined_query.strip() == content.strip():
+                    chunks = await speculative if speculative else await self.qdrant_client.aget_relevant_chunks(
+                        content, top_k=settings.top_k_neighbors, query_vector=query_vector
+                    )
+                else:
+                    chunks = await self.qdrant_client.aget_relevant_chunks(
+                        refined_query, top_k=settings.top_k_neighbors, query_vector=refined_vector
+                    )
+                    if speculative:
+                        # Raw-query hits fill in what the refined query missed, best scores first
+                        chunks = merge_hits(chunks, await speculative, settings.top_k_neighbors)
+        except Exception as e:
+            if route == "rag":
+                print(f"Error retrieving relevant information: {e}")
+                return [], [], "Error retrieving relevant information.", None
+            raise
+        finally:
+            # Discarded when the route is direct
+            if speculative and not speculative.done():
+                speculative.cancel()
 
         messages = [("system", prompts.main_sys_prompt.template)]
+        if summary:
+            messages.append(("system", f"Summary of the earlier conversation:\n{summary}"))
         
         # Add chat history before the current query
         messages.extend(chat_history)
 
+        sources_list = []
         if route == "rag":
-            # Retrieval using refined query for better results
             try:
-                chunks = self.qdrant_client.get_relevant_chunks(
-                    refined_query, top_k=settings.top_k_neighbors  # Use refined query here
-                )
                 if not chunks:
-                    return "No relevant information found.", []
+                    return messages, [], "No relevant information found.", None
 
-                # get doc title helper
-                doc_title = (
-                    lambda doc_id: s.query(Document.title)
-                    .filter(Document.id == doc_id)
-                    .first()[0]
-                    if doc_id else "Unknown Document"
-                )
+                # Titles are in the payload; only points indexed before that need a lookup
+                untitled = {c.payload["document_id"] for c in chunks if not c.payload.get("title") and c.payload.get("document_id")}
+                titles = await run_io(self._doc_titles, untitled) if untitled else {}
+                # Format sources consistently for both providers
+                sources_list = [
+                    {
+                        "text": c.payload["text"],
+                        "source": c.payload.get("title") or titles.get(c.payload.get("document_id"), "Unknown Document"),
+                        "page": c.payload.get("page"),
+                        "section": c.payload.get("section_path"),
+                    }
+                    for c in chunks
+                ]
 
                 messages.append(("human", prompts.main_user_prompt.format(
-                    context=[{"text": c.payload["text"], "source": doc_title(c.payload["document_id"])}
-                             for c in chunks],
+                    context=sources_list,
                     query=content  # Keep original user query in the prompt for natural response
                 )))
             except Exception as e:
                 print(f"Error retrieving relevant information: {e}")
-                return "Error retrieving relevant information.", []
+                return messages, [], "Error retrieving relevant information.", None
         else:
             # Direct, no retrieval
             messages.append(("human", content))
 
-        # Call LLM
-        sources_list = []
-        if route == "rag" and chunks:
-            # get doc title helper (redefined for proper scope)
-            doc_title = (
-                lambda doc_id: s.query(Document.title)
-                .filter(Document.id == doc_id)
-                .first()[0]
-                if doc_id else "Unknown Document"
-            )
-            # Format sources consistently for both providers
-            sources_list = [
-                {"text": c.payload["text"], "source": doc_title(c.payload["document_id"])}
-                for c in chunks
-            ]
-        
         print(f"Generated {len(sources_list)} sources")
         for source in sources_list:
             print(f"Source: {source['source']}")
-        
+        return messages, sources_list, None, cache_key
+
+    def _cache_answer(self, cache_key: tuple | None, provider: str, answer: str, sources: list):
+        from .registry import get_chat_cache
+        chat_cache = get_chat_cache()
+        if chat_cache and cache_key and answer:
+            vector, version = cache_key
+            chat_cache.put(vector, provider, version, {"answer": answer, "sources": sources})
+
+    def _chat_model(self, provider: str):
         if provider == "gemini":
-            return self.generate_gemini(messages), sources_list
+            return self.gemini_llm
         elif provider == "openai":
-            return self.generate_openai(messages), sources_list
+            return self.openai_llm
+        raise ValueError(f"Unsupported provider: {provider}")
+
+    async def generate_response(self, content: str, provider: str, session_id: str = None) -> tuple[str, list]:
+        """
+        Generate response (RAG or direct) using specified provider with chat history.
+        Database reads run in the IO pool; routing, retrieval and generation are awaited.
+        """
+        self._chat_model(provider)  # Validate before paying for routing/retrieval
+        messages, sources_list, answer, cache_key = await self._prepare_messages(content, provider, session_id)
+        if answer is not None:
+            return answer, sources_list
+
+        # Call LLM
+        if provider == "gemini":
+            answer = await self.generate_gemini(messages)
         else:
-            raise ValueError(f"Unsupported provider: {provider}")
\ No newline at end of file
+            answer = await self.generate_openai(messages)
+        self._cache_answer(cache_key, provider, answer, sources_list)
+        return answer, sources_list
+
+    async def stream_response(self, content: str, provider: str, session_id: str = None):
+        """
+        Streaming variant of `generate_response`.
+        Yields {"type": "sources"} as soon as retrieval is done, then {"type": "token"}
+        for every chunk from the chat model's `astream`, and finally {"type": "answer"}
+        with the full text (the caller persists it). If generation fails, the last event
+        is {"type": "error"} and no answer is yielded, so nothing gets persisted.
+        """
+        chat_model = self._chat_model(provider)
+        messages, sources_list, answer, cache_key = await self._prepare_messages(content, provider, session_id)
+        yield {"type": "sources", "sources": sources_list}
+        if answer is not None:
+            yield {"type": "token", "content": answer}
+            yield {"type": "answer", "content": answer}
+            return
+
+        client = get_client(
+            public_key=settings.langfuse_public_key,
+        )
+        parts = []
+        try:
+            async for chunk in chat_model.astream(messages):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield {"type": "token", "content": chunk.content}
+        except Exception as e:
+            print(f"{provider} LLM streaming error: {e}")
+            yield {"type": "error", "error": str(e)}
+            return
+        finally:
+            client.flush()
+        answer = "".join(parts).strip()
+        self._cache_answer(cache_key, provider, answer, sources_list)
+        yield {"type": "answer", "content": answer}
@@ -1,16 +1,57 @@
 import logging
+import numpy as np
 from sentence_transformers import CrossEncoder
 
 from ..config import settings
+from .backends import load_model, model_key
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Output order of the cross-encoder/nli-* models
+NLI_LABELS = ['contradiction', 'entailment', 'neutral']
+
 class NLIProvider:
-    def __init__(self):
-        logger.info(f"Initializing NLIProvider with model: {settings.nli_model}")
-        self.model = CrossEncoder(settings.nli_model)
+    def __init__(self, model_name: str | None = None, backend: str | None = None, quantization: str | None = None):
+        model_name = model_name or settings.nli_model
+        backend = backend or settings.nli_backend
+        quantization = settings.nli_onnx_quantization if quantization is None else quantization
+        logger.info(f"Initializing NLIProvider with model: {model_name} ({backend}{', ' + quantization if quantization else ''})")
+        self.model_key = model_key(model_name, backend=backend, quantization=quantization)
+        self.model = load_model(CrossEncoder, model_name, backend=backend, quantization=quantization)
 
     def predict(self, sentence_pairs: list[tuple[str, str]]) -> list[float]:
         return self.model.predict(sentence_pairs)
-        
\ No newline at end of file
+
+    def predict_proba(self, sentence_pairs: list[tuple[str, str]], batch_size: int | None = None) -> np.ndarray:
+        """
+        Score many pairs at once.
+        Pairs are sorted by token length so each batch pads to a similar length,
+        run through the cross-encoder in batches of `batch_size`, and softmaxed
+        in a single vectorized pass. Rows are returned in input order.
+        """
+        batch_size = batch_size or settings.nli_batch_size
+        if not sentence_pairs:
+            return np.empty((0, len(NLI_LABELS)), dtype=np.float32)
+
+        encoded = self.model.tokenizer(
+            [a for a, _ in sentence_pairs], [b for _, b in sentence_pairs],
+            add_special_tokens=False, truncation=False,
+        )["input_ids"]
+        order = np.argsort([len(ids) for ids in encoded], kind="stable")
+
+        logits = np.asarray(self.model.predict(
+            [sentence_pairs[i] for i in order],
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ), dtype=np.float32)
+
+        # Numerically stable softmax over the label axis
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        out = np.empty_like(probs)
+        out[order] = probs
+        return out
@@ -1,3 +1,4 @@
+from xxhash import xxh64
 from langchain_core.prompts import PromptTemplate
 
 conflict_sys_prompt = PromptTemplate(
@@ -60,6 +61,9 @@ First, reason through the problem. Then, generate your final response. Your enti
 }
 """)
 
+# Changes whenever the conflict prompt is edited; part of the LLM verdict cache key
+conflict_prompt_version = xxh64(conflict_sys_prompt.template.encode()).hexdigest()[:8]
+
 main_sys_prompt = PromptTemplate(
     template="""
 You are a helpful AI assistant designed to answer user queries and provide information based on the context given to you. Your responses should be **concise**, **relevant**, and **informative**.
@@ -119,4 +123,59 @@ Respond with valid JSON:
   "route": "rag" or "direct",
   "refined_query": "refined version of the query for better document search or empty string",
 }}"""
-)
\ No newline at end of file
+)
+
+history_summary_prompt = PromptTemplate(
+    template="""Update the running summary of a conversation between a user and an assistant.
+Keep facts, names, numbers, decisions and open questions the user may refer back to; drop greetings and filler.
+Write at most {max_words} words of plain prose.
+
+Current summary:
+{summary}
+
+New messages to fold in:
+{messages}
+
+Updated summary:"""
+)
+
+# Example queries per route for the local embedding router (see providers/router.py).
+# Queries too far from both sets, or equally close to both, go to the LLM router.
+router_exemplars = {
+    "direct": [
+        "hi",
+        "hello there",
+        "good morning!",
+        "thanks, that helps",
+        "thank you so much",
+        "bye",
+        "who are you?",
+        "what can you do?",
+        "how can you help me?",
+        "ok great",
+        "can you explain that more simply?",
+        "what is 15% of 240?",
+        "translate 'good morning' into French",
+        "write a short poem about the sea",
+        "what does API stand for?",
+        "how are you today?",
+    ],
+    "rag": [
+        "what does the policy say about remote work?",
+        "how many vacation days do employees get?",
+        "what is the refund policy for annual plans?",
+        "summarize the onboarding document",
+        "what are the security requirements for vendors?",
+        "who approves expense reports above the limit?",
+        "what is the deadline for submitting the quarterly report?",
+        "list the steps to request parental leave",
+        "what does the contract say about termination?",
+        "which products are covered by the warranty?",
+        "what are the pricing tiers in the latest price list?",
+        "according to the handbook, what is the dress code?",
+        "what changed in the latest version of the guidelines?",
+        "what is the escalation process for critical incidents?",
+        "how is overtime calculated?",
+        "what SLA do we offer enterprise customers?",
+    ],
+}
@@ -1,42 +1,249 @@
+import asyncio
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from qdrant_client import QdrantClient, AsyncQdrantClient
-from qdrant_client.models import Distance, VectorParams
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, SearchRequest, Filter, FieldCondition, MatchValue, PayloadSchemaType,
+    HnswConfigDiff, OptimizersConfigDiff, VectorParamsDiff, SearchParams, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, BinaryQuantization, BinaryQuantizationConfig,
+)
 
 from ..config import settings
-from ..providers.embeddings import EmbeddingsProvider
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Payload fields used in search filters
+PAYLOAD_INDEXES = {
+    "document_id": PayloadSchemaType.KEYWORD,
+    "status": PayloadSchemaType.KEYWORD,
+}
+
+def quantization_config():
+    """Vector quantization from settings (None, scalar int8 or binary)."""
+    if settings.qdrant_quantization == "scalar":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8, quantile=settings.qdrant_scalar_quantile, always_ram=settings.qdrant_quantization_always_ram,
+        ))
+    if settings.qdrant_quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=settings.qdrant_quantization_always_ram))
+    if settings.qdrant_quantization:
+        raise ValueError(f"Unknown QDRANT_QUANTIZATION: {settings.qdrant_quantization!r} (expected '', 'scalar' or 'binary')")
+    return None
+
+def search_params() -> SearchParams | None:
+    """Search-time HNSW ef and quantization rescoring; None leaves the server defaults."""
+    quantization = None
+    if settings.qdrant_quantization:
+        quantization = QuantizationSearchParams(rescore=settings.qdrant_rescore, oversampling=settings.qdrant_oversampling)
+    if not settings.qdrant_search_ef and quantization is None:
+        return None
+    return SearchParams(hnsw_ef=settings.qdrant_search_ef or None, quantization=quantization)
+
+def published_filter() -> Filter:
+    """Only chunks of published documents (status is denormalized into the payload)."""
+    return Filter(must=[FieldCondition(key="status", match=MatchValue(value="published"))])
+
 class QdrantProvider:
     def __init__(self):
-        logger.info(f"Initializing QdrantProvider with URL: {settings.qdrant_url}")
-        self.client = QdrantClient(url=settings.qdrant_url)
-        self.async_client = AsyncQdrantClient(url=settings.qdrant_url)
+        logger.info(f"Initializing QdrantProvider with URL: {settings.qdrant_url} ({'gRPC' if settings.qdrant_prefer_grpc else 'HTTP'})")
+        options = dict(
+            url=settings.qdrant_url,
+            prefer_grpc=settings.qdrant_prefer_grpc,
+            grpc_port=settings.qdrant_grpc_port,
+            timeout=settings.qdrant_timeout,
+        )
+        # Blocking client for code that already runs in worker threads (bulk upserts, sync endpoints);
+        # async client (one shared connection pool) for everything on the event loop
+        self.client = QdrantClient(**options)
+        self.async_client = AsyncQdrantClient(**options)
+        self._search_slots: asyncio.Semaphore | None = None
+        self._ensured: set[str] = set()
 
-    def ensure_collection(self, name: str, dim: int = 384):
-        if name not in [c.name for c in self.client.get_collections().collections]:
+    def ensure_collection(self, name: str, dim: int | None = None):
+        """
+        Create the collection (tuned from settings) and its payload indexes if needed.
+        Checked once per process; `dim` defaults to the loaded embedding model's dimension.
+        """
+        if name in self._ensured:
+            return
+        if dim is None:
+            from .registry import get_embeddings
+            dim = get_embeddings().dimension
+        if not self.client.collection_exists(name):
+            logger.info(f"Creating collection {name} (dim={dim}, m={settings.qdrant_hnsw_m}, quantization={settings.qdrant_quantization or 'none'})")
             self.client.create_collection(
                 collection_name=name,
-                vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+                vectors_config=VectorParams(size=dim, distance=Distance.COSINE, on_disk=settings.qdrant_on_disk_vectors),
+                hnsw_config=HnswConfigDiff(
+                    m=settings.qdrant_hnsw_m,
+                    ef_construct=settings.qdrant_hnsw_ef_construct,
+                    on_disk=settings.qdrant_hnsw_on_disk,
+                ),
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=settings.qdrant_indexing_threshold),
+                quantization_config=quantization_config(),
+                on_disk_payload=settings.qdrant_on_disk_payload,
             )
+        else:
+            size = self.client.get_collection(name).config.params.vectors.size
+            if size != dim:
+                raise RuntimeError(f"Collection {name} has {size}-dim vectors but the embedding model produces {dim}")
+        # Idempotent; also covers collections created before the indexes existed
+        for field, schema in PAYLOAD_INDEXES.items():
+            self.client.create_payload_index(collection_name=name, field_name=field, field_schema=schema)
+        self._ensured.add(name)
+
+    def tune_collection(self, name: str):
+        """Apply the current HNSW/optimizer/quantization settings to an existing collection (triggers re-indexing)."""
+        self.client.update_collection(
+            collection_name=name,
+            vectors_config={"": VectorParamsDiff(on_disk=settings.qdrant_on_disk_vectors)},
+            hnsw_config=HnswConfigDiff(
+                m=settings.qdrant_hnsw_m,
+                ef_construct=settings.qdrant_hnsw_ef_construct,
+                on_disk=settings.qdrant_hnsw_on_disk,
+            ),
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=settings.qdrant_indexing_threshold),
+            quantization_config=quantization_config(),
+        )
+
+    def set_document_payload(self, name: str, document_id, payload: dict, wait: bool = False):
+        """Set payload fields (e.g. status) on every point of a document."""
+        self.client.set_payload(
+            collection_name=name,
+            payload=payload,
+            points=Filter(must=[FieldCondition(key="document_id", match=MatchValue(value=str(document_id)))]),
+            wait=wait,
+        )
+
+    def delete_points(self, name: str, ids: list[str], wait: bool = False):
+        """Delete points by id, `qdrant_delete_batch_size` ids per request."""
+        size = settings.qdrant_delete_batch_size
+        for i in range(0, len(ids), size):
+            self.client.delete(collection_name=name, points_selector=ids[i:i + size], wait=wait)
 
     def drop_collection(self, name: str):
         try:
             self.client.delete_collection(collection_name=name)
         except Exception:
             pass
+        self._ensured.discard(name)
     
-    def get_relevant_chunks(self, content: str, top_k: int = 5) -> list:
+    def get_relevant_chunks(self, content: str, top_k: int = 5, published_only: bool = True) -> list:
         """
         Retrieve relevant chunks from Qdrant based on the query.
+        With `published_only`, drafts and documents pending review are filtered out inside the ANN search.
         """
-        embedder = EmbeddingsProvider()
-        query_vector = embedder.embed_text(content)
+        from .registry import get_embeddings
+        query_vector = get_embeddings().embed_text(content)
         return self.client.search(
             collection_name="chunks",
             query_vector=query_vector,
+            query_filter=published_filter() if published_only else None,
+            search_params=search_params(),
+            limit=top_k,
+            with_payload=True,
+        )
+
+    async def aget_relevant_chunks(self, content: str, top_k: int = 5, published_only: bool = True, query_vector: list[float] | None = None) -> list:
+        """Async `get_relevant_chunks`; the query is embedded in the IO pool unless its vector is given."""
+        if query_vector is None:
+            from .registry import get_embeddings
+            from ..services.executors import run_io
+            query_vector = await run_io(get_embeddings().embed_text, content)
+        return await self.async_client.search(
+            collection_name="chunks",
+            query_vector=query_vector,
+            query_filter=published_filter() if published_only else None,
+            search_params=search_params(),
             limit=top_k,
             with_payload=True,
-        )
\ No newline at end of file
+        )
+
+    async def search_many(self, collection_name: str, requests: list[SearchRequest], batch_size: int | None = None) -> list[list]:
+        """
+        Run many searches as concurrent `search_batch` calls of `batch_size` requests each,
+        at most `qdrant_max_concurrency` in flight. Results are returned in request order.
+        """
+        batch_size = batch_size or settings.conflict_search_batch_size
+        if self._search_slots is None:
+            self._search_slots = asyncio.Semaphore(settings.qdrant_max_concurrency)
+
+        async def run(batch):
+            async with self._search_slots:
+                return await self.async_client.search_batch(collection_name=collection_name, requests=batch)
+
+        batches = await asyncio.gather(*(run(requests[start:start + batch_size]) for start in range(0, len(requests), batch_size)))
+        return [result for batch in batches for result in batch]
+
+    async def retrieve_vectors(self, collection_name: str, ids: list[str]) -> dict[str, list[float]]:
+        if not ids:
+            return {}
+        points = await self.async_client.retrieve(collection_name=collection_name, ids=ids, with_vectors=True)
+        return {str(point.id): point.vector for point in points}
+
+class BulkPointWriter:
+    """
+    Batched, pipelined upserts into a Qdrant collection.
+
+    Points passed to `write` are buffered and sent in batches of `batch_size`
+    on a background thread, so the caller can encode the next batch while the
+    previous one is uploading. Intermediate batches honour `wait`; the final
+    batch sent by `flush` always uses `wait=True`, which acts as a consistency
+    barrier for everything written before it.
+
+    Works with any `QdrantClient`, including `QdrantClient(":memory:")`.
+    """
+
+    def __init__(self, client: QdrantClient, collection_name: str, batch_size: int | None = None, wait: bool | None = None):
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = batch_size or settings.qdrant_upsert_batch_size
+        self.wait = settings.qdrant_upsert_wait if wait is None else wait
+        self.written = 0
+        self._buffer: list[PointStruct] = []
+        self._pending: Future | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qdrant-upsert")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self.close()
+
+    def write(self, points: list[PointStruct]):
+        self._buffer.extend(points)
+        # Keep at least one point back so `flush` always has a batch to use as the barrier
+        while len(self._buffer) > self.batch_size:
+            batch, self._buffer = self._buffer[:self.batch_size], self._buffer[self.batch_size:]
+            self._submit(batch, wait=self.wait)
+
+    def flush(self):
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            self._submit(batch, wait=True)
+        self._drain()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _submit(self, batch: list[PointStruct], *, wait: bool):
+        # At most one request in flight: upload N while the caller prepares N+1
+        self._drain()
+        self._pending = self._executor.submit(
+            self.client.upsert,
+            collection_name=self.collection_name,
+            points=batch,
+            wait=wait,
+        )
+        self.written += len(batch)
+
+    def _drain(self):
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
@@ -0,0 +1,124 @@
+"""
+Process-wide registry of providers.
+
+Every provider is created lazily on first use and at most once per process,
+so all services and routers share the same models and clients.
+"""
+import os
+import time
+import logging
+import resource
+import threading
+
+from ..config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_instances: dict[str, object] = {}
+_footprints: dict[str, dict] = {}
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak RSS (KiB on Linux) where /proc is unavailable
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _param_bytes(provider) -> int | None:
+    """Bytes held by the weights of a torch-backed model, None for other backends."""
+    model = getattr(provider, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return None
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors) or None
+    except Exception:
+        return None
+
+def _get(name: str, factory):
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    with _lock:
+        instance = _instances.get(name)
+        if instance is None:
+            rss_before, start = _rss_bytes(), time.perf_counter()
+            instance = factory()
+            _instances[name] = instance
+            _footprints[name] = {
+                "model": getattr(instance, "model_key", None),
+                "load_seconds": round(time.perf_counter() - start, 3),
+                "rss_delta_bytes": _rss_bytes() - rss_before,
+                "param_bytes": _param_bytes(instance),
+            }
+            logger.info(f"Loaded {name}: {_footprints[name]}")
+        return instance
+
+def get_embeddings():
+    from .embeddings import EmbeddingsProvider
+    return _get("embeddings", EmbeddingsProvider)
+
+def get_nli():
+    from .nli import NLIProvider
+    return _get("nli", NLIProvider)
+
+def get_screen_nli():
+    """The small screening NLI model, or None when the screening tier is disabled."""
+    if not settings.nli_screen_model:
+        return None
+    from .nli import NLIProvider
+    return _get("nli_screen", lambda: NLIProvider(model_name=settings.nli_screen_model))
+
+def get_router():
+    """The local embedding router, or None when chat routing is left to the LLM."""
+    if not settings.local_router_enabled:
+        return None
+    from .router import EmbeddingRouter
+    return _get("router", EmbeddingRouter)
+
+def get_llm():
+    from .llm import LLMProvider
+    return _get("llm", LLMProvider)
+
+def get_qdrant():
+    from .qdrant_client import QdrantProvider
+    return _get("qdrant", QdrantProvider)
+
+def get_storage():
+    from .storage import StorageProvider
+    return _get("storage", StorageProvider)
+
+def get_embed_cache():
+    if not settings.embed_cache_enabled:
+        return None
+    from .cache import EmbeddingCache
+    return _get("embed_cache", lambda: EmbeddingCache(model_name=get_embeddings().model_key))
+
+def get_verdict_cache():
+    if not settings.verdict_cache_enabled:
+        return None
+    from .cache import VerdictCache
+    return _get("verdict_cache", VerdictCache)
+
+def get_chat_cache():
+    if not settings.chat_cache_enabled:
+        return None
+    from .cache import SemanticCache
+    return _get("chat_cache", SemanticCache)
+
+WARM_UP = {"embeddings": get_embeddings, "nli": get_nli, "nli_screen": get_screen_nli, "router": get_router}
+
+def warm_up(providers: set[str] | None = None):
+    """Load the given providers (all of `WARM_UP` by default) up front so the first request does not pay for it."""
+    names = [name for name in WARM_UP if providers is None or name in providers]
+    logger.info(f"Warming up {', '.join(names)}...")
+    for name in names:
+        WARM_UP[name]()
+
+def memory_footprint() -> dict:
+    """Load time, RSS growth at load and (torch only) weight bytes of every model loaded so far."""
+    models = {"embeddings", "nli", "nli_screen"}
+    return {name: dict(info) for name, info in _footprints.items() if name in models}
@@ -0,0 +1,41 @@
+import logging
+import numpy as np
+
+from ..config import settings
+from . import prompts
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class EmbeddingRouter:
+    """
+    Local chat router: classifies a query as "rag" or "direct" by cosine
+    similarity to the exemplar queries in `prompts.router_exemplars`.
+
+    Each route scores the mean of its `router_top_k` most similar exemplars.
+    The decision is trusted only when the best score reaches
+    `router_min_similarity` and beats the other route by `router_margin`;
+    otherwise `route` returns None and the caller falls back to the LLM router.
+    """
+
+    def __init__(self, embeddings=None):
+        from .registry import get_embeddings
+        self.embeddings = embeddings or get_embeddings()
+        self.routes = list(prompts.router_exemplars)
+        texts = [text for route in self.routes for text in prompts.router_exemplars[route]]
+        labels = [route for route in self.routes for _ in prompts.router_exemplars[route]]
+        logger.info(f"Initializing EmbeddingRouter with {len(texts)} exemplars")
+        self.exemplars = self.embeddings.embed_batch(texts)  # normalized rows
+        self.labels = np.asarray(labels)
+
+    def scores(self, query_vector) -> dict[str, float]:
+        sims = self.exemplars @ np.asarray(query_vector, dtype=np.float32)
+        k = settings.router_top_k
+        return {route: float(np.sort(sims[self.labels == route])[-k:].mean()) for route in self.routes}
+
+    def route(self, query_vector) -> str | None:
+        scores = self.scores(query_vector)
+        (best, best_score), (_, runner_up) = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:2]
+        confident = best_score >= settings.router_min_similarity and best_score - runner_up >= settings.router_margin
+        logger.info(f"Local router scores {scores} -> {best if confident else 'undecided'}")
+        return best if confident else None
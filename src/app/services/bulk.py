@@ -0,0 +1,59 @@
+"""
+Entries of bulk uploads.
+
+Uploads are plain files or zip/tar archives. Archives are read member by
+member from the (spooled) upload file, so only one entry per in-flight
+ingest is held in memory.
+"""
+import os
+import logging
+import tarfile
+import zipfile
+from typing import BinaryIO, Iterator
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+def is_archive(filename: str) -> bool:
+    name = filename.lower()
+    return name.endswith(".zip") or name.endswith(TAR_SUFFIXES)
+
+def _skip(name: str) -> bool:
+    # Directories and OS metadata (__MACOSX/, .DS_Store, ._foo)
+    base = os.path.basename(name.rstrip("/"))
+    return not base or base.startswith(".") or name.startswith("__MACOSX/")
+
+def iter_entries(filename: str, fileobj: BinaryIO, max_bytes: int) -> Iterator[tuple[str, bytes | None]]:
+    """
+    Yield (name, content) for every file of an upload.
+    Entries larger than `max_bytes` are yielded with content None so they can be reported.
+    """
+    if not is_archive(filename):
+        content = fileobj.read(max_bytes + 1)
+        yield filename, content if len(content) <= max_bytes else None
+        return
+
+    if filename.lower().endswith(".zip"):
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or _skip(info.filename):
+                    continue
+                if info.file_size > max_bytes:
+                    yield info.filename, None
+                    continue
+                with archive.open(info) as member:
+                    content = member.read(max_bytes + 1)
+                yield info.filename, content if len(content) <= max_bytes else None
+        return
+
+    # Streaming mode: members are read in order without seeking
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile() or _skip(member.name):
+                continue
+            if member.size > max_bytes:
+                yield member.name, None
+                continue
+            yield member.name, archive.extractfile(member).read()
@@ -0,0 +1,107 @@
+import re
+import bisect
+import logging
+from functools import lru_cache
+
+import numpy as np
+import tiktoken
+
+from ..config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ENCODING_NAME = "cl100k_base"
+HEADING_RE = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str = ENCODING_NAME) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(name)
+
+@lru_cache(maxsize=None)
+def _token_byte_lengths(name: str = ENCODING_NAME) -> np.ndarray:
+    """UTF-8 byte length of every token id in the vocabulary."""
+    enc = get_encoding(name)
+    lengths = np.zeros(enc.n_vocab, dtype=np.int64)
+    for token in range(enc.n_vocab):
+        try:
+            lengths[token] = len(enc.decode_single_token_bytes(token))
+        except KeyError:  # unused ids between the regular and special tokens
+            pass
+    return lengths
+
+def token_len(text: str) -> int:
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+def _char_to_byte_offsets(text: str, char_offsets: list[int]) -> list[int]:
+    """Convert sorted character offsets into UTF-8 byte offsets in one pass."""
+    out, byte_pos, char_pos = [], 0, 0
+    for offset in char_offsets:
+        byte_pos += len(text[char_pos:offset].encode())
+        char_pos = offset
+        out.append(byte_pos)
+    return out
+
+def _section_index(text: str) -> tuple[list[int], list[str]]:
+    """Start offsets (chars) of markdown sections and their heading paths, e.g. "Policy > Leave > Sick leave"."""
+    starts, paths, stack = [], [], []
+    for match in HEADING_RE.finditer(text):
+        level = len(match.group(1))
+        stack = [h for h in stack if h[0] < level] + [(level, match.group(2).strip())]
+        starts.append(match.start())
+        paths.append(" > ".join(title for _, title in stack))
+    return starts, paths
+
+def chunk_text(text: str, page_starts: list[int] | None = None, chunk_size: int | None = None, chunk_overlap: int | None = None) -> list[dict]:
+    """
+    Split text into token windows of `chunk_size` tokens overlapping by `chunk_overlap`.
+
+    The document is tokenized once; chunk boundaries are token offsets mapped back
+    to the source text, so no text is re-tokenized. `page_starts` holds the
+    character offset where each page begins (page numbers are 1-based); sections
+    come from markdown headings in the text.
+    """
+    if not text:
+        return []
+    chunk_size = chunk_size or settings.chunk_size
+    chunk_overlap = settings.chunk_overlap if chunk_overlap is None else chunk_overlap
+    if not 0 <= chunk_overlap < chunk_size:
+        raise ValueError(f"chunk_overlap ({chunk_overlap}) must be in [0, chunk_size ({chunk_size}))")
+
+    tokens = np.asarray(get_encoding().encode(text, disallowed_special=()), dtype=np.int64)
+    if not len(tokens):
+        return []
+    # Byte offset at which every token starts (plus the end of the text)
+    token_bytes = np.concatenate(([0], np.cumsum(_token_byte_lengths()[tokens])))
+    data = text.encode()
+
+    section_starts, section_paths = _section_index(text)
+    page_bytes = _char_to_byte_offsets(text, page_starts or [])
+    section_bytes = _char_to_byte_offsets(text, section_starts)
+
+    def char_boundary(b: int) -> int:
+        # Byte-level BPE may split a multi-byte character; move to the next character start
+        while b < len(data) and 0x80 <= data[b] < 0xC0:
+            b += 1
+        return b
+
+    chunks = []
+    step = chunk_size - chunk_overlap
+    for start in range(0, len(tokens), step):
+        end = min(start + chunk_size, len(tokens))
+        b_start, b_end = char_boundary(int(token_bytes[start])), char_boundary(int(token_bytes[end]))
+        chunk = data[b_start:b_end].decode()
+        stripped = chunk.strip()
+        if stripped:
+            # Attribute the chunk to where its first non-whitespace character is
+            b_first = b_start + len(chunk[:len(chunk) - len(chunk.lstrip())].encode())
+            page = bisect.bisect_right(page_bytes, b_first) if page_bytes else None
+            section = bisect.bisect_right(section_bytes, b_first) - 1
+            chunks.append({
+                "text": stripped,
+                "page": page or None,
+                "section_path": section_paths[section] if section >= 0 else None,
+            })
+        if end == len(tokens):
+            break
+    return chunks
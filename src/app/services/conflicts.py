@@ -0,0 +1,162 @@
+"""
+Conflict queries for the review API.
+
+Listing is keyset-paginated on (created_at, id) and loads both chunk texts
+through aliased joins, so a page costs one query regardless of its size.
+Bulk resolution is set-based: one UPDATE ... FROM and one DELETE per batch.
+"""
+import uuid
+import base64
+import logging
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import any_, delete, func, literal, or_, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session, aliased
+
+from ..models.app_models import Chunk, Conflict
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(created_at: datetime, conflict_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{conflict_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        created_at, conflict_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(conflict_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _filtered(query, new_chunk, existing_chunk, *, document_id=None, label=None, judged_by=None, resolved=False):
+    query = query.filter(Conflict.resolved_at.isnot(None) if resolved else Conflict.resolved_at.is_(None))
+    if document_id:
+        # Conflicts the document is on either side of
+        query = query.filter(or_(new_chunk.document_id == document_id, existing_chunk.document_id == document_id))
+    if label:
+        query = query.filter(Conflict.label == label)
+    if judged_by:
+        query = query.filter(Conflict.judged_by == judged_by)
+    return query
+
+def list_conflicts(s: Session, *, cursor: str | None = None, limit: int = 100, document_id: uuid.UUID | None = None,
+                   label: str | None = None, judged_by: str | None = None, resolved: bool = False) -> dict:
+    """One page of conflicts (oldest first) with both chunk texts, plus the cursor of the next page."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    new_chunk, existing_chunk = aliased(Chunk), aliased(Chunk)
+    query = (
+        s.query(
+            Conflict,
+            new_chunk.text, new_chunk.document_id,
+            existing_chunk.text, existing_chunk.document_id,
+        )
+        .outerjoin(new_chunk, new_chunk.id == Conflict.new_chunk_id)
+        .outerjoin(existing_chunk, existing_chunk.id == Conflict.existing_chunk_id)
+    )
+    query = _filtered(query, new_chunk, existing_chunk, document_id=document_id, label=label, judged_by=judged_by, resolved=resolved)
+    if cursor:
+        query = query.filter(tuple_(Conflict.created_at, Conflict.id) > tuple_(*decode_cursor(cursor)))
+    rows = query.order_by(Conflict.created_at, Conflict.id).limit(limit + 1).all()
+
+    items = [
+        {
+            "id": str(c.id),
+            "new_chunk_id": str(c.new_chunk_id),
+            "existing_chunk_id": str(c.existing_chunk_id),
+            "new_document_id": str(new_doc) if new_doc else None,
+            "existing_document_id": str(existing_doc) if existing_doc else None,
+            "label": c.label,
+            "score": c.score,
+            "neighbor_sim": c.neighbor_sim,
+            "judged_by": c.judged_by,
+            "resolution_action": c.resolution_action,
+            "created_at": c.created_at.isoformat() if c.created_at else None,
+            "new_chunk_text": new_text if new_text is not None else "Content not available",
+            "existing_chunk_text": existing_text if existing_text is not None else "Content not available",
+        }
+        for c, new_text, new_doc, existing_text, existing_doc in rows[:limit]
+    ]
+    last = rows[limit - 1][0] if len(rows) > limit else None
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(last.created_at, last.id) if last else None,
+    }
+
+def conflict_counts(s: Session, *, document_id: uuid.UUID | None = None, resolved: bool = False) -> dict:
+    """Conflict totals by label and by judge, plus the number of new chunks flagged as duplicates."""
+    new_chunk, existing_chunk = aliased(Chunk), aliased(Chunk)
+
+    def scoped(query):
+        if document_id:
+            query = query.join(new_chunk, new_chunk.id == Conflict.new_chunk_id).join(existing_chunk, existing_chunk.id == Conflict.existing_chunk_id)
+        return _filtered(query, new_chunk, existing_chunk, document_id=document_id, resolved=resolved)
+
+    total, by_label, by_judged_by = 0, {}, {}
+    for label, judged_by, count in scoped(s.query(Conflict.label, Conflict.judged_by, func.count(Conflict.id))).group_by(Conflict.label, Conflict.judged_by).all():
+        total += count
+        by_label[label] = by_label.get(label, 0) + count
+        by_judged_by[judged_by or "unknown"] = by_judged_by.get(judged_by or "unknown", 0) + count
+    dedup_groups = scoped(s.query(func.count(func.distinct(Conflict.new_chunk_id)))).filter(Conflict.label == "duplicate").scalar() or 0
+    return {
+        "total": total,
+        "by_label": by_label,
+        "by_judged_by": by_judged_by,
+        "dedup_groups": dedup_groups,
+    }
+
+def _any(column, ids):
+    # `= ANY(:ids)` binds one array parameter instead of one parameter per id
+    return column == any_(literal(list(ids), ARRAY(UUID(as_uuid=True))))
+
+def resolve_batch(s: Session, action: str, note: str | None = None, *, document_ids: list[uuid.UUID] | None = None,
+                  limit: int = 1000) -> dict:
+    """
+    Resolve up to `limit` of the oldest unresolved conflicts (optionally only those
+    touching `document_ids`) and delete the losing chunks; the caller commits.
+    "supersede" keeps the new chunk, "ignore" keeps the existing one.
+    Returns the resolved count, the removed chunk ids and the documents of the kept chunks.
+    """
+    new_chunk, existing_chunk = aliased(Chunk), aliased(Chunk)
+    query = s.query(Conflict.id).filter(Conflict.resolved_at.is_(None))
+    if document_ids:
+        query = (
+            query.join(new_chunk, new_chunk.id == Conflict.new_chunk_id)
+            .join(existing_chunk, existing_chunk.id == Conflict.existing_chunk_id)
+            .filter(or_(new_chunk.document_id.in_(document_ids), existing_chunk.document_id.in_(document_ids)))
+        )
+    ids = [conflict_id for conflict_id, in query.order_by(Conflict.created_at, Conflict.id).limit(limit).all()]
+    if not ids:
+        return {"resolved": 0, "removed_chunk_ids": [], "document_ids": set()}
+
+    conflicts_t = Conflict.__table__
+    new_t, existing_t = Chunk.__table__.alias("new_chunk"), Chunk.__table__.alias("existing_chunk")
+    keep, drop = (new_t, existing_t) if action == "supersede" else (existing_t, new_t)
+    rows = s.execute(
+        update(conflicts_t)
+        .where(
+            _any(conflicts_t.c.id, ids),
+            conflicts_t.c.resolved_at.is_(None),
+            new_t.c.id == conflicts_t.c.new_chunk_id,
+            existing_t.c.id == conflicts_t.c.existing_chunk_id,
+        )
+        .values(
+            resolution_action=action,
+            resolved_at=func.now(),
+            resolver_note=note or func.concat(f"Bulk resolution: {action} - kept ", keep.c.id, ", removed ", drop.c.id),
+        )
+        .returning(keep.c.document_id, drop.c.id)
+    ).all()
+
+    removed = list({chunk_id for _, chunk_id in rows})
+    if removed:
+        # Cascades to the chunks' conflicts (including the ones just resolved)
+        s.execute(delete(Chunk.__table__).where(_any(Chunk.__table__.c.id, removed)))
+    return {
+        "resolved": len(rows),
+        "removed_chunk_ids": [str(chunk_id) for chunk_id in removed],
+        "document_ids": {document_id for document_id, _ in rows},
+    }
@@ -0,0 +1,74 @@
+"""
+Executors for blocking work in async code paths.
+
+- CPU pool (processes): pure, picklable CPU-heavy stages such as parsing and
+  chunking. Uses "spawn" so workers never inherit torch threads or open
+  database connections from the API process.
+- IO pool (threads): blocking client calls (Qdrant, MinIO, Postgres) and model
+  inference. Models are loaded once in the parent process and torch/ONNX
+  Runtime release the GIL while they compute, so threads are the right fit.
+- Bulk pool (threads): documents stored by a bulk upload, kept apart so a large
+  upload cannot occupy every IO thread that requests and publishing rely on.
+
+Coroutines await these instead of blocking the event loop.
+"""
+import asyncio
+import logging
+import threading
+import multiprocessing
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from ..config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cpu_pool: Executor | None = None
+_io_pool: Executor | None = None
+_bulk_pool: Executor | None = None
+
+def cpu_pool() -> Executor:
+    """Process pool; falls back to the IO thread pool when CPU_POOL_WORKERS is 0."""
+    global _cpu_pool
+    if settings.cpu_pool_workers <= 0:
+        return io_pool()
+    with _lock:
+        if _cpu_pool is None:
+            logger.info(f"Starting CPU process pool with {settings.cpu_pool_workers} workers")
+            _cpu_pool = ProcessPoolExecutor(
+                max_workers=settings.cpu_pool_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _cpu_pool
+
+def io_pool() -> Executor:
+    global _io_pool
+    with _lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(max_workers=settings.io_pool_workers, thread_name_prefix="io")
+        return _io_pool
+
+def bulk_pool() -> Executor:
+    global _bulk_pool
+    with _lock:
+        if _bulk_pool is None:
+            _bulk_pool = ThreadPoolExecutor(max_workers=settings.bulk_ingest_concurrency, thread_name_prefix="bulk")
+        return _bulk_pool
+
+async def run_cpu(fn, *args, **kwargs):
+    """Run a picklable function in the CPU process pool."""
+    return await asyncio.get_running_loop().run_in_executor(cpu_pool(), partial(fn, *args, **kwargs))
+
+async def run_io(fn, *args, **kwargs):
+    """Run a blocking call (I/O or model inference) in the thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(io_pool(), partial(fn, *args, **kwargs))
+
+def shutdown():
+    global _cpu_pool, _io_pool, _bulk_pool
+    with _lock:
+        for pool in (_cpu_pool, _io_pool, _bulk_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = _io_pool = _bulk_pool = None
@@ -1,18 +1,29 @@
+import os
 import uuid
 import asyncio
+import tarfile
+import zipfile
+import threading
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
 from fastapi import UploadFile, HTTPException
 from ..providers.app_context import AppContext
-from ..providers.storage import StorageProvider
+from ..providers import registry
 from ..models.app_models import Document, Chunk
 from xxhash import xxh64
 import io
 import logging
 from datetime import datetime, timezone
 from .utils import *
-from ..providers.qdrant_client import QdrantProvider
-from qdrant_client.models import Filter, FieldCondition
+from . import jobs
+from .conflicts import conflict_counts
+from .bulk import iter_entries
+from .executors import bulk_pool, run_cpu, run_io
+from ..config import settings
+from ..providers.qdrant_client import BulkPointWriter, search_params
+from qdrant_client.models import Filter, FieldCondition, PointStruct, SearchRequest
 from ..providers.embeddings import EmbeddingsProvider
+from ..providers.cache import EmbeddingCache, VerdictCache, bump_corpus_version
 from ..providers.llm import LLMProvider
 from ..providers.nli import NLIProvider
 
@@ -28,16 +39,40 @@ ALLOWED_EXT = ["txt",
 ]
 
 MAX_FILE_BYTES = 10 * 1024 * 1024
+# Rows per conflict INSERT (7 bind parameters each, Postgres allows 65535 per statement)
+CONFLICT_INSERT_BATCH = 5000
 
 class IngestionService:
     def __init__(self):
         self.control_db = None
         self.ctx = None
-        self.storage = StorageProvider()
-        self.qdrant = QdrantProvider()
-        self.llm = LLMProvider()
-        self.nli_model = NLIProvider()
-        self.embed_model = EmbeddingsProvider()
+        # Providers are process-wide singletons, loaded lazily on first use
+        self.storage = registry.get_storage()
+        self.qdrant = registry.get_qdrant()
+
+    @property
+    def llm(self) -> LLMProvider:
+        return registry.get_llm()
+
+    @property
+    def nli_model(self) -> NLIProvider:
+        return registry.get_nli()
+
+    @property
+    def screen_nli_model(self) -> NLIProvider | None:
+        return registry.get_screen_nli()
+
+    @property
+    def embed_model(self) -> EmbeddingsProvider:
+        return registry.get_embeddings()
+
+    @property
+    def embed_cache(self) -> EmbeddingCache | None:
+        return registry.get_embed_cache()
+
+    @property
+    def verdict_cache(self) -> VerdictCache | None:
+        return registry.get_verdict_cache()
 
     def init_tenant(self, context: AppContext, db: Session):
         self.control_db = db
@@ -52,41 +87,37 @@ class IngestionService:
         self.storage.client.put_object(self.ctx.bucket, object_name, io.BytesIO(content), length=len(content))
         return object_name
 
-    def _parse_document(self, *, storage_key: str, extension: str, docling: bool) -> str:
+    async def _parse_document(self, *, storage_key: str, extension: str, docling: bool) -> tuple[str, list[int]]:
         """
-        Parse the document based on extension.
-        - PDF -> Docling
-        - Text/Markdown/URL -> simple text parsing
-        - Excel -> Convert to CSV(pandas) and parse CSV
-        - CSV -> CSV parsing
+        Parse the document based on extension (see parsing.parse_content).
+        Returns the text and the character offset of each page start (empty if unknown).
+        The download runs in the IO pool and parsing in the CPU process pool.
         """
         # Get the document content from storage
-        content = self.storage.client.get_object(self.ctx.bucket, storage_key).read()
-        if extension == "pdf":
-            # Use PDF parsing pipeline
-            return pdf_parse(content, docling=docling)
-        elif extension in ["txt", "md"]:
-            # Simple text parsing
-            return content.decode()
-        elif extension in ["xlsx", "xls"]:
-            return excel_parse(content)
-        elif extension == "csv":
-            return csv_parse(content)
-        
-        return ""
+        content = await run_io(lambda: self.storage.client.get_object(self.ctx.bucket, storage_key).read())
+        return await run_cpu(parse_content, content, extension, docling)
+
+    async def _chunk_document(self, *, document_id: uuid.UUID, text: str, page_starts: list[int] | None = None) -> int:
+        existing = await run_io(self._count_chunks, document_id)
+        if existing > 0:
+            # Already chunked, return existing count
+            return existing
+
+        chunks = await run_cpu(chunk_text, text, page_starts=page_starts)
+        if not chunks:
+            return 0
+        return await run_io(self._store_chunks, document_id=document_id, chunks=chunks)
 
-    def _chunk_document(self, *, document_id: uuid.UUID, text: str) -> int:
+    def _count_chunks(self, document_id: uuid.UUID) -> int:
+        s = self.ctx.get_db_session()
+        try:
+            return s.query(Chunk).filter(Chunk.document_id == document_id).count()
+        finally:
+            self.ctx.close_session(s)
+
+    def _store_chunks(self, *, document_id: uuid.UUID, chunks: list[dict]) -> int:
         s = self.ctx.get_db_session()
         try:
-            existing = s.query(Chunk).filter(Chunk.document_id == document_id).count()
-            if existing > 0:
-                # Already chunked, return existing count
-                return existing
-            
-            chunks = chunk_text(text)
-            if not chunks:
-                return 0
-            
             chunk_objects = [
                 Chunk(document_id=document_id, idx=i, text=chunk["text"], hash=xxh64(chunk["text"].encode()).hexdigest(), page=chunk.get("page"), section_path=chunk.get("section_path"))
                 for i, chunk in enumerate(chunks)
@@ -100,115 +131,153 @@ class IngestionService:
         finally:
             self.ctx.close_session(s)
 
-    def _embed_document_chunks(self, *, document_id: uuid.UUID) -> int:
+    def _embed_document_chunks(self, *, document_id: uuid.UUID) -> dict[str, list[float]]:
+        """
+        Embed all chunks of a document and upsert them into Qdrant.
+        Returns the vectors keyed by chunk id so conflict detection can reuse them.
+        """
         s = self.ctx.get_db_session()
         try:
             chunks = s.query(Chunk).filter(Chunk.document_id == document_id)
             if not chunks.count():
                 raise HTTPException(status_code=404, detail="No chunks found for document")
-            embed_vectors = embed_chunks([chunk.text for chunk in chunks], embedder=self.embed_model)
-            # Store embeddings in qdrant
-            self.qdrant.ensure_collection(self.ctx.qdrant_collection, dim=384)
-            for chunk, vector in zip(chunks, embed_vectors):
-                self.qdrant.client.upsert(
-                    collection_name=self.ctx.qdrant_collection,
-                    points=[{
-                        "id": str(chunk.id),
-                        "vector": vector,
-                        "payload": {
-                            "text": chunk.text,
-                            "document_id": str(document_id),
-                            "idx": chunk.idx,
-                        }
-                    }]
-                )
+            chunks = chunks.all()
+            title, status = s.query(Document.title, Document.status).filter(Document.id == document_id).one()
+            self.qdrant.ensure_collection(self.ctx.qdrant_collection, dim=self.embed_model.dimension)
+            vectors = {}
+            # Encode batch N+1 while the writer uploads batch N in the background
+            batch_size = settings.qdrant_upsert_batch_size
+            # Only cache misses go through the model
+            cached = self.embed_cache.get_many([chunk.hash for chunk in chunks]) if self.embed_cache else {}
+            with BulkPointWriter(self.qdrant.client, self.ctx.qdrant_collection, batch_size=batch_size) as writer:
+                for start in range(0, len(chunks), batch_size):
+                    batch = chunks[start:start + batch_size]
+                    misses = {chunk.hash: chunk.text for chunk in batch if chunk.hash not in cached}
+                    if misses:
+                        embed_vectors = embed_chunks(list(misses.values()), embedder=self.embed_model)
+                        fresh = dict(zip(misses.keys(), embed_vectors))
+                        if self.embed_cache:
+                            self.embed_cache.put_many(fresh)
+                        cached.update(fresh)
+                    points = []
+                    for chunk in batch:
+                        vectors[str(chunk.id)] = cached[chunk.hash].tolist()
+                        points.append(PointStruct(
+                            id=str(chunk.id),
+                            vector=vectors[str(chunk.id)],
+                            payload={
+                                "text": chunk.text,
+                                "document_id": str(document_id),
+                                "idx": chunk.idx,
+                                "hash": chunk.hash,
+                                # Denormalized so retrieval needs no DB lookups; status is kept in sync by _sync_payload_status
+                                "title": title,
+                                "status": status,
+                                "page": chunk.page,
+                                "section_path": chunk.section_path,
+                            },
+                        ))
+                    writer.write(points)
             s.commit()
-            return len(embed_vectors)
+            return vectors
         except Exception as e:
             s.rollback()
             raise HTTPException(status_code=500, detail=f"Error embedding document chunks: {str(e)}")
         finally:
             self.ctx.close_session(s)
 
-    async def _detect_conflicts(self, *, document_id: uuid.UUID) -> dict:
+    async def _search_neighbors(self, *, document_id: uuid.UUID, chunks: list[Chunk], vectors: dict[str, list[float]] | None = None) -> list[list]:
         """
-        Detect duplicates and contradictions using NLI model
-        Steps:
-        1. Get 10 semantically similar chunks from Qdrant for each chunk in the document.
-        2. Do NLI inference to find duplicates and contradictions.
+        Find similar chunks from other documents for every chunk of a document.
+        Neighbours below the similarity floor are dropped by Qdrant. Reuses the vectors from the embed stage when given, otherwise fetches
+        them in one retrieve call. Queries go out as concurrent batched search requests.
+        """
+        vectors = dict(vectors or {})
+        missing = [str(chunk.id) for chunk in chunks if str(chunk.id) not in vectors]
+        vectors.update(await self.qdrant.retrieve_vectors(self.ctx.qdrant_collection, missing))
+
+        # Search in all chunks except the ones of the current document
+        other_documents = Filter(
+            must_not=[
+                FieldCondition(
+                    key="document_id",
+                    match={"value": str(document_id)}
+                )
+            ]
+        )
+        requests = [
+            SearchRequest(
+                vector=vectors[str(chunk.id)],
+                filter=other_documents,
+                limit=settings.conflict_neighbor_limit,
+                score_threshold=settings.neighbor_similarity_floor,
+                params=search_params(),
+                with_payload=True,
+            )
+            for chunk in chunks
+        ]
+        return await self.qdrant.search_many(self.ctx.qdrant_collection, requests)
+
+    async def _iter_conflicts(self, *, document_id: uuid.UUID, vectors: dict[str, list[float]] | None = None):
+        """
+        Detect duplicates and contradictions using a tiered cascade, one batch of chunks at a time.
+        Steps (per batch of `conflict_batch_size` chunks):
+        1. Get up to `conflict_neighbor_limit` similar chunks above the similarity floor from Qdrant (batched search).
+        2. Screen pairs with a small NLI model; only undecided pairs go to the large NLI model.
         3. If NLI scores are below a threshold, use LLM to analyze text for contradictions.
+        4. Store the batch's conflicts and yield them with the progress so far.
+        The next batch's neighbour search runs while the current batch is being judged.
+        Finished batches are persisted, so an interrupted run keeps them (and the verdict cache makes a rerun cheap).
         """
         s = self.ctx.get_db_session()
         try:
-            # Get all chunks for the document
-            chunks = s.query(Chunk).filter(Chunk.document_id == document_id).all()
-            if not chunks:
-                return {"duplicates": [], "contradictions": []}
-
-            logger.info(f"Detecting conflicts for document: {document_id} with {len(chunks)} chunks")
-
-            all_conflicts = {"duplicates": [], "contradictions": []}
-            all_llm_tasks = []
-            for chunk in chunks:
-                # Get the embedding vector for the chunk from qdrant
-                get_chunk_vector = lambda chunk_id: self.qdrant.client.retrieve(
-                    collection_name=self.ctx.qdrant_collection,
-                    ids=[str(chunk_id)],
-                    with_vectors=True,
-                )[0].vector
-
-                # Get 10 similar chunks for each chunk in the document from Qdrant
-                similar_chunks = self.qdrant.client.search(
-                    collection_name=self.ctx.qdrant_collection,
-                    query_vector=get_chunk_vector(chunk.id),
-                    limit=10,
-                    query_filter=Filter( # Search in all document chunks except the current one
-                        must_not=[
-                            FieldCondition(
-                                key="document_id",
-                                match={"value": str(document_id)}
-                            )
-                        ]
-                    ),
-                    with_payload=True,
-                )
+            chunks = s.query(Chunk).filter(Chunk.document_id == document_id).order_by(Chunk.idx).all()
+        finally:
+            self.ctx.close_session(s)
+        if not chunks:
+            return
 
-                logger.info(f"Found {len(similar_chunks) if similar_chunks else 0} similar chunks for chunk {chunk.id}")
-                
-                semaphore = asyncio.Semaphore(5)  # Up to 5 concurrent LLM calls
-                
-                # Check for duplicates/contradictions
-                conflicts, llm_tasks = await check_conflicts(chunk, similar_chunks, nli_model=self.nli_model, llm=self.llm, semaphore=semaphore)
+        logger.info(f"Detecting conflicts for document: {document_id} with {len(chunks)} chunks")
+        semaphore = asyncio.Semaphore(5)  # Up to 5 concurrent LLM calls
+        batch_size = settings.conflict_batch_size
+        batches = [chunks[start:start + batch_size] for start in range(0, len(chunks), batch_size)]
 
-                all_llm_tasks.extend(llm_tasks)
-                
-                # Full Parallelism: Remove these 2 lines
-                all_conflicts["duplicates"].extend(conflicts["duplicates"])
-                all_conflicts["contradictions"].extend(conflicts["contradictions"])
-
-            logger.info(f"LLM tasks to execute: {len(all_llm_tasks)}")
-            results = await asyncio.gather(*all_llm_tasks)
-            for result in results:
-                if not result: continue
-                if result['label'].lower() == 'entailment':
-                    all_conflicts["duplicates"].append(result['payload'])
-                elif result['label'].lower() == 'contradiction':
-                    all_conflicts["contradictions"].append(result['payload'])
-                        
-            logger.info(f"All conflicts detected: {all_conflicts}")
-            
-            # Store conflicts in database
-            self._store_conflicts(all_conflicts, s)
-            
-            return all_conflicts
+        def search(batch):
+            return asyncio.ensure_future(self._search_neighbors(document_id=document_id, chunks=batch, vectors=vectors))
+
+        processed = 0
+        pending_search = search(batches[0])
+        try:
+            for i, batch in enumerate(batches):
+                neighbors = await pending_search
+                pending_search = search(batches[i + 1]) if i + 1 < len(batches) else None
+
+                conflicts, llm_tasks = await check_conflicts(
+                    list(zip(batch, neighbors)), nli_model=self.nli_model, llm=self.llm, semaphore=semaphore,
+                    verdict_cache=self.verdict_cache, screen_model=self.screen_nli_model
+                )
+                for result in await asyncio.gather(*llm_tasks):
+                    if not result: continue
+                    if result['label'].lower() == 'entailment':
+                        conflicts["duplicates"].append(result['payload'])
+                    elif result['label'].lower() == 'contradiction':
+                        conflicts["contradictions"].append(result['payload'])
+
+                await run_io(self._store_conflicts, conflicts)
+                processed += len(batch)
+                logger.info(f"Conflict analysis {processed}/{len(chunks)} chunks: {len(conflicts['duplicates'])} duplicates, {len(conflicts['contradictions'])} contradictions in batch")
+                yield {"chunks_processed": processed, "total_chunks": len(chunks), **conflicts}
         finally:
-            self.ctx.close_session(s)
+            if pending_search:
+                pending_search.cancel()
 
-    async def publish_document_stream(self, document_id: uuid.UUID, *, docling: bool = False):
-        """Stream publishing progress with real-time updates"""
+    async def publish_document_stream(self, document_id: uuid.UUID, *, docling: bool = False, checkpoint: str | None = None):
+        """
+        Stream publishing progress with real-time updates.
+        `checkpoint` is the last durable stage ("chunked"/"embedded") reached by an
+        earlier attempt of the same publish job; those stages are skipped on retry.
+        """
         import time
-        from tqdm import tqdm
-        from datetime import datetime, timezone
         
         s = self.ctx.get_db_session()
         try:
@@ -220,47 +289,51 @@ class IngestionService:
                 yield {"stage": "complete", "ok": True, "document_id": str(doc.id), "already_published": True}
                 return
 
-            # Stage 1: Parse
-            yield {"stage": "parsing", "message": f"Parsing document with {'Docling' if docling else 'PyPDF2'}...", "progress": 0}
-            start_time = time.time()
-            
-            logger.info(f"Parsing document: {doc.id} with extension: {doc.extension}, Storage key: {doc.storage_key}")
-            parsed_text = self._parse_document(storage_key=doc.storage_key, extension=doc.extension, docling=docling)
-            
-            parse_time = time.time() - start_time
-            yield {"stage": "parsed", "message": f"Document parsed in {parse_time:.2f}s", "progress": 20, "text_length": len(parsed_text)}
-
-            # Stage 2: Chunk
-            yield {"stage": "chunking", "message": "Splitting document into 200-token chunks...", "progress": 20}
-            start_time = time.time()
-            
-            logger.info(f"Chunking document: {doc.id} with parsed text length: {len(parsed_text)}")
-            created_chunks = self._chunk_document(text=parsed_text, document_id=document_id)
-            
-            chunk_time = time.time() - start_time
-            yield {"stage": "chunked", "message": f"Created {created_chunks} chunks in {chunk_time:.2f}s", "progress": 40, "chunks_created": created_chunks}
+            created_chunks = await run_io(self._count_chunks, document_id) if checkpoint in ("chunked", "embedded") else 0
+            if created_chunks:
+                yield {"stage": "chunked", "message": f"Resuming with {created_chunks} existing chunks", "progress": 40, "chunks_created": created_chunks}
+            else:
+                # Stage 1: Parse
+                yield {"stage": "parsing", "message": f"Parsing document with {'Docling' if docling else 'PyPDF2'}...", "progress": 0}
+                start_time = time.time()
+                
+                logger.info(f"Parsing document: {doc.id} with extension: {doc.extension}, Storage key: {doc.storage_key}")
+                parsed_text, page_starts = await self._parse_document(storage_key=doc.storage_key, extension=doc.extension, docling=docling)
+                
+                parse_time = time.time() - start_time
+                yield {"stage": "parsed", "message": f"Document parsed in {parse_time:.2f}s", "progress": 20, "text_length": len(parsed_text)}
 
-            # Stage 3: Embed
-            yield {"stage": "embedding", "message": f"Generating embeddings for {created_chunks} chunks...", "progress": 40}
-            start_time = time.time()
-            
-            logger.info(f"Embedding document chunks for: {doc.id}, Chunk count: {created_chunks}")
-            embedded = self._embed_document_chunks(document_id=document_id)
-            
-            embed_time = time.time() - start_time
-            yield {"stage": "embedded", "message": f"Generated embeddings in {embed_time:.2f}s", "progress": 70, "chunks_embedded": embedded}
+                # Stage 2: Chunk
+                yield {"stage": "chunking", "message": f"Splitting document into {settings.chunk_size}-token chunks...", "progress": 20}
+                start_time = time.time()
+                
+                logger.info(f"Chunking document: {doc.id} with parsed text length: {len(parsed_text)}")
+                created_chunks = await self._chunk_document(text=parsed_text, page_starts=page_starts, document_id=document_id)
+                
+                chunk_time = time.time() - start_time
+                yield {"stage": "chunked", "message": f"Created {created_chunks} chunks in {chunk_time:.2f}s", "progress": 40, "chunks_created": created_chunks}
+
+            if checkpoint == "embedded":
+                # Vectors are already in Qdrant; conflict detection fetches them
+                vectors = None
+                yield {"stage": "embedded", "message": "Resuming with existing embeddings", "progress": 70, "chunks_embedded": created_chunks}
+            else:
+                # Stage 3: Embed
+                yield {"stage": "embedding", "message": f"Generating embeddings for {created_chunks} chunks...", "progress": 40}
+                start_time = time.time()
+                
+                logger.info(f"Embedding document chunks for: {doc.id}, Chunk count: {created_chunks}")
+                vectors = await run_io(self._embed_document_chunks, document_id=document_id)
+                
+                embed_time = time.time() - start_time
+                yield {"stage": "embedded", "message": f"Generated embeddings in {embed_time:.2f}s", "progress": 70, "chunks_embedded": len(vectors)}
 
             # Stage 4: Analyze conflicts with progress
             yield {"stage": "analyzing", "message": "Analyzing conflicts with existing content...", "progress": 70}
             start_time = time.time()
             
-            # Get chunks for progress tracking
-            chunks = s.query(Chunk).filter(Chunk.document_id == document_id).all()
-            chunk_count = len(chunks)
-            
+            chunk_count = await run_io(self._count_chunks, document_id)
             logger.info(f"Analyzing conflicts for document: {doc.id} with {chunk_count} chunks")
-            
-            # Provide realistic progress updates during conflict detection
             yield {
                 "stage": "analyzing",
                 "message": f"Analyzing {chunk_count} chunks for conflicts...",
@@ -268,9 +341,23 @@ class IngestionService:
                 "chunks_processed": 0,
                 "total_chunks": chunk_count
             }
-            
-            # Call the real conflict detection
-            conflicts = await self._detect_conflicts(document_id=document_id)
+
+            # Forward per-batch progress and the conflicts found so far
+            conflicts = {"duplicates": [], "contradictions": []}
+            async for batch in self._iter_conflicts(document_id=document_id, vectors=vectors):
+                conflicts["duplicates"].extend(batch["duplicates"])
+                conflicts["contradictions"].extend(batch["contradictions"])
+                yield {
+                    "stage": "analyzing",
+                    "message": f"Analyzed {batch['chunks_processed']}/{batch['total_chunks']} chunks",
+                    "progress": 75 + int(15 * batch["chunks_processed"] / max(batch["total_chunks"], 1)),
+                    "chunks_processed": batch["chunks_processed"],
+                    "total_chunks": batch["total_chunks"],
+                    "duplicates": batch["duplicates"],
+                    "contradictions": batch["contradictions"],
+                    "duplicates_count": len(conflicts["duplicates"]),
+                    "contradictions_count": len(conflicts["contradictions"]),
+                }
             conflict_time = time.time() - start_time
             
             logger.info(f"Conflicts found: {conflicts}")
@@ -289,8 +376,7 @@ class IngestionService:
             
             if has_conflicts:
                 # Set status to pending_review when conflicts are found
-                doc.status = "pending_review"
-                s.commit()
+                await run_io(self._commit_status, s, doc, "pending_review")
                 yield {
                     "stage": "conflicts_detected",
                     "message": f"Conflicts detected - requires review",
@@ -306,9 +392,7 @@ class IngestionService:
 
             # Stage 5: Publish (no conflicts)
             yield {"stage": "publishing", "message": "Finalizing publication...", "progress": 90}
-            doc.status = "published"
-            doc.effective_at = datetime.now(timezone.utc)
-            s.commit()
+            await run_io(self._commit_status, s, doc, "published")
             
             yield {
                 "stage": "complete",
@@ -322,70 +406,87 @@ class IngestionService:
         finally:
             self.ctx.close_session(s)
 
-    def _store_conflicts(self, conflicts: dict, session):
-        """Store detected conflicts in the database"""
+    def _store_conflicts(self, conflicts: dict, session=None) -> int:
+        """
+        Store detected conflicts in the database (in a session of its own unless one is given).
+        All pairs go out in one INSERT ... ON CONFLICT DO NOTHING per CONFLICT_INSERT_BATCH rows;
+        pairs already stored (unique new/existing chunk pair) are skipped. Returns the rows inserted.
+        """
         from ..models.app_models import Conflict
-        
-        # Store contradictions
-        for contradiction in conflicts.get("contradictions", []):
-            # Map the field names from conflict detection to database schema
-            new_chunk_id = contradiction.get("chunk_id")
-            existing_chunk_id = contradiction.get("conflicting_chunk_id")
-            
-            if not new_chunk_id or not existing_chunk_id:
-                logger.warning(f"Skipping contradiction with missing IDs: {contradiction}")
-                continue
-                
-            existing_conflict = session.query(Conflict).filter(
-                Conflict.new_chunk_id == new_chunk_id,
-                Conflict.existing_chunk_id == existing_chunk_id
-            ).first()
-            
-            if not existing_conflict:
-                conflict_record = Conflict(
-                    new_chunk_id=new_chunk_id,
-                    existing_chunk_id=existing_chunk_id,
-                    label="contradiction",
-                    score=contradiction.get("score", 0.0),
-                    neighbor_sim=contradiction.get("neighbor_sim"),
-                    judged_by=contradiction.get("judged_by", "unknown"),
-                    resolution_action=None
-                )
-                session.add(conflict_record)
-        
-        # Store duplicates as contradictions with different label
-        for duplicate in conflicts.get("duplicates", []):
-            # Map the field names from conflict detection to database schema
-            new_chunk_id = duplicate.get("chunk_id")
-            existing_chunk_id = duplicate.get("conflicting_chunk_id")
-            
-            if not new_chunk_id or not existing_chunk_id:
-                logger.warning(f"Skipping duplicate with missing IDs: {duplicate}")
-                continue
-                
-            existing_conflict = session.query(Conflict).filter(
-                Conflict.new_chunk_id == new_chunk_id,
-                Conflict.existing_chunk_id == existing_chunk_id
-            ).first()
-            
-            if not existing_conflict:
-                conflict_record = Conflict(
-                    new_chunk_id=new_chunk_id,
-                    existing_chunk_id=existing_chunk_id,
-                    label="duplicate",
-                    score=duplicate.get("score", 0.0),
-                    neighbor_sim=duplicate.get("neighbor_sim"),
-                    judged_by=duplicate.get("judged_by", "unknown"),
-                    resolution_action=None
-                )
-                session.add(conflict_record)
-        
+        if session is None:
+            session = self.ctx.get_db_session()
+            try:
+                return self._store_conflicts(conflicts, session)
+            finally:
+                self.ctx.close_session(session)
+
+        rows = []
+        # Duplicates are stored with their own label next to contradictions
+        for label, key in (("contradiction", "contradictions"), ("duplicate", "duplicates")):
+            for conflict in conflicts.get(key, []):
+                # Map the field names from conflict detection to database schema
+                new_chunk_id = conflict.get("chunk_id")
+                existing_chunk_id = conflict.get("conflicting_chunk_id")
+                if not new_chunk_id or not existing_chunk_id:
+                    logger.warning(f"Skipping {label} with missing IDs: {conflict}")
+                    continue
+                rows.append({
+                    "id": uuid.uuid4(),
+                    "new_chunk_id": new_chunk_id,
+                    "existing_chunk_id": existing_chunk_id,
+                    "label": label,
+                    "score": conflict.get("score", 0.0),
+                    "neighbor_sim": conflict.get("neighbor_sim"),
+                    "judged_by": conflict.get("judged_by", "unknown"),
+                })
+        if not rows:
+            return 0
+
+        inserted = 0
+        for start in range(0, len(rows), CONFLICT_INSERT_BATCH):
+            result = session.execute(
+                insert(Conflict)
+                .values(rows[start:start + CONFLICT_INSERT_BATCH])
+                .on_conflict_do_nothing(index_elements=[Conflict.new_chunk_id, Conflict.existing_chunk_id])
+            )
+            inserted += result.rowcount
         session.commit()
+        logger.info(f"Stored {inserted} of {len(rows)} conflicts ({len(rows) - inserted} already known)")
+        return inserted
+
+    def _sync_payload_status(self, document_id: uuid.UUID, status: str):
+        """Mirror a document status into its Qdrant payloads (chat only retrieves published chunks); waits until applied."""
+        self.qdrant.set_document_payload(self.ctx.qdrant_collection, document_id, {"status": status}, wait=True)
+
+    def _restore_payload_status(self, document_id: uuid.UUID, status: str):
+        try:
+            self._sync_payload_status(document_id, status)
+        except Exception as e:
+            logger.error(f"Failed to restore status '{status}' of document {document_id} in Qdrant, run `python -m app.maintenance sync-payloads`: {e}")
+
+    def _commit_status(self, session, doc: Document, status: str):
+        """
+        Move a document to `status` in Qdrant first, then in Postgres (bumping the corpus
+        version when it is published), so the committed status is always searchable as such
+        and no answer is cached under the new version before the payloads are.
+        Raises when Qdrant fails, which fails (and retries) the publish job.
+        """
+        previous = doc.status
+        self._sync_payload_status(doc.id, status)
+        try:
+            doc.status = status
+            if status == "published":
+                doc.effective_at = datetime.now(timezone.utc)
+                bump_corpus_version(session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            self._restore_payload_status(doc.id, previous)
+            raise
 
     def _check_and_publish_if_ready(self, document_id: uuid.UUID, session):
         """Check if document has any unresolved conflicts and publish if ready"""
         from ..models.app_models import Conflict, Document
-        from datetime import datetime, timezone
         
         # Get the document
         doc = session.query(Document).filter(Document.id == document_id).first()
@@ -402,14 +503,61 @@ class IngestionService:
         
         if unresolved_conflicts == 0:
             # No unresolved conflicts, publish the document
-            doc.status = "published"
-            doc.effective_at = datetime.now(timezone.utc)
-            session.commit()
+            try:
+                self._commit_status(session, doc, "published")
+            except Exception as e:
+                # Stays pending_review in both stores; the next resolution retries
+                logger.error(f"Failed to publish document {document_id} after conflict resolution: {e}")
+                return False
             logger.info(f"Document {document_id} published after conflict resolution")
             return True
             
         return False
 
+    def _publish_ready_documents(self, document_ids, session) -> list[uuid.UUID]:
+        """Set-based `_check_and_publish_if_ready`: publish every pending_review document of `document_ids` without unresolved conflicts"""
+        from sqlalchemy import exists, update
+        from ..models.app_models import Conflict
+
+        if not document_ids:
+            return []
+        blocked = exists().where(
+            Conflict.new_chunk_id == Chunk.id,
+            Chunk.document_id == Document.id,
+            Conflict.resolved_at.is_(None),
+        )
+        ready = session.query(Document.id).filter(
+            Document.id.in_(list(document_ids)), Document.status == "pending_review", ~blocked
+        ).with_for_update().all()
+
+        # Payloads first (see _commit_status); documents Qdrant fails on stay pending_review
+        published = []
+        for document_id, in ready:
+            try:
+                self._sync_payload_status(document_id, "published")
+                published.append(document_id)
+            except Exception as e:
+                logger.error(f"Failed to publish document {document_id} after conflict resolution: {e}")
+        if not published:
+            session.commit()
+            return []
+        try:
+            session.execute(
+                update(Document)
+                .where(Document.id.in_(published))
+                .values(status="published", effective_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            bump_corpus_version(session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            for document_id in published:
+                self._restore_payload_status(document_id, "pending_review")
+            raise
+        logger.info(f"Published {len(published)} documents after conflict resolution")
+        return published
+
     def _validate_file(self, file: UploadFile | str) -> str:
         """Validate file extension and size.
         Returns a hash of the file content for deduplication."""
@@ -420,14 +568,16 @@ class IngestionService:
             # If valid, return a hash of the URL for deduplication
             return xxh64(file.encode()).hexdigest(), None
 
-        ext = file.filename.split('.')[-1] or "txt"
+        content = file.file.read()
+        return self._validate_content(filename=file.filename, content=content), content
+
+    def _validate_content(self, *, filename: str, content: bytes) -> str:
+        ext = filename.split('.')[-1] or "txt"
         if ext.lower() not in ALLOWED_EXT:
             raise HTTPException(status_code=415, detail=f"Unsupported file extension: {ext}")
-        content = file.file.read()
         if len(content) > MAX_FILE_BYTES:
             raise HTTPException(status_code=413, detail=f"File exceeds max size {MAX_FILE_BYTES} bytes")
-        file_hash = xxh64(content).hexdigest()
-        return file_hash, content
+        return xxh64(content).hexdigest()
 
     def ingest(self, file: UploadFile | str, title: str | None = None):
         """
@@ -442,13 +592,20 @@ class IngestionService:
         """
         # Step 1: Validate Extension & size
         file_hash, content = self._validate_file(file)
+        if content:
+            return self._create_document(content=content, file_hash=file_hash, external_ref=file.filename, extension=file.filename.split('.')[-1], title=title)
+        return self._create_document(content=None, file_hash=file_hash, external_ref=file, extension='txt', title=title)
 
+    def ingest_bytes(self, *, content: bytes, filename: str, title: str | None = None):
+        """Upload a file already read into memory (e.g. an archive entry). Same steps as `ingest`."""
+        file_hash = self._validate_content(filename=filename, content=content)
+        return self._create_document(content=content, file_hash=file_hash, external_ref=filename, extension=filename.split('.')[-1], title=title)
+
+    def _create_document(self, *, content: bytes | None, file_hash: str, external_ref: str, extension: str, title: str | None):
         s = self.ctx.get_db_session()
         duplicate = False
         
         try:
-            external_ref = file.filename if content else file
-            extension = file.filename.split('.')[-1] if content else 'txt'
             existing_doc = s.query(Document).filter(Document.external_ref == external_ref).first()
             if existing_doc:
                 # Step 1b: Duplicate (exact) short-circuit based on hash vs current file_hash
@@ -486,66 +643,68 @@ class IngestionService:
         finally:
             self.ctx.close_session(s)
 
-    async def publish(self, document_id: uuid.UUID, docling: bool = False):
+    def ingest_bulk(self, files: list[UploadFile], *, publish: bool = True, docling: bool = False) -> dict:
         """
-        Publish a document.
-        
-        Steps:
-        1. Ensure document exists and is not already published.
-        2. Parse the document, using appropriate tools based on extension.
-        3. Chunk the document, using langchain recursive text splitter.
-        4. Embed the document, using embedding model.
-        5. Analyze duplicates and contradictions.
-        6. Publish the document if no conflicts are found.
-        """
-        s = self.ctx.get_db_session()
-        try:
-            doc = s.query(Document).filter(Document.id == document_id).first()
-            if not doc:
-                return {"ok": False, "error": "not_found"}
-            if doc.status == "published":
-                return {"ok": True, "document_id": str(doc.id), "already_published": True}
-
-            # Stage 1: Parse
-            logger.info(f"Parsing document: {doc.id} with extension: {doc.extension}, Storage key: {doc.storage_key}")
-            parsed_text = self._parse_document(storage_key=doc.storage_key, extension=doc.extension, docling=docling)
+        Upload many files and/or zip/tar archives in one call.
 
-            # Stage 2: Chunk
-            logger.info(f"Chunking document: {doc.id} with parsed text length: {len(parsed_text)}")
-            created_chunks = self._chunk_document(text=parsed_text, document_id=document_id)
-
-            # Stage 3: Embed
-            logger.info(f"Embedding document chunks for: {doc.id}, Chunk count: {created_chunks}")
-            embedded = self._embed_document_chunks(document_id=document_id)
+        Entries are streamed out of the uploads and stored in the bulk pool with at
+        most `settings.bulk_ingest_concurrency` in flight. With `publish`, every stored
+        document gets a publish job tagged with the returned batch id, so workers
+        parse, chunk and embed the batch concurrently while later entries are
+        still uploading. Invalid entries are reported and skipped.
+        """
+        batch_id = uuid.uuid4()
+        slots = threading.BoundedSemaphore(settings.bulk_ingest_concurrency)
+        documents, rejected, futures = [], [], []
 
-            # Stage 4: Analyze duplicates & contradictions
-            logger.info(f"Analyzing conflicts for document: {doc.id}, Embedded chunks: {embedded}")
-            conflicts = await self._detect_conflicts(document_id=document_id)
-            logger.info(f"Conflicts found: {conflicts}")
-            has_conflicts = bool(conflicts.get("duplicates") or conflicts.get("contradictions"))
-            if has_conflicts:
-                # Set status to pending_review when conflicts are found
-                doc.status = "pending_review"
-                s.commit()
-                return {
-                    "ok": True,  # Changed to True since the operation succeeded
-                    "requires_review": True,
-                    "document_id": str(doc.id),
-                    "conflicts": conflicts,
-                    "stage": "analyzed",
-                }
+        def store(name: str, content: bytes):
+            try:
+                result = self.ingest_bytes(content=content, filename=name, title=os.path.basename(name))
+                if publish:
+                    s = self.ctx.get_db_session()
+                    try:
+                        job = jobs.enqueue_publish(s, uuid.UUID(result["document_id"]), docling=docling, batch_id=batch_id)
+                        result["job_id"] = str(job.id)
+                    finally:
+                        self.ctx.close_session(s)
+                return {"name": name, **result}
+            except HTTPException as e:
+                return {"name": name, "error": e.detail, "status_code": e.status_code}
+            except Exception as e:
+                logger.exception(f"Bulk upload {batch_id}: failed to store {name}")
+                return {"name": name, "error": str(e), "status_code": 500}
+            finally:
+                slots.release()
 
-            # Stage 5: Publish (no conflicts)
-            doc.status = "published"
-            doc.effective_at = datetime.now(timezone.utc)
-            s.commit()
-            return {
-                "ok": True,
-                "document_id": str(doc.id),
-                "published": True,
-                "chunks": created_chunks,
-                "embedded": embedded,
-            }
+        for upload in files:
+            try:
+                for name, content in iter_entries(upload.filename, upload.file, MAX_FILE_BYTES):
+                    if content is None:
+                        rejected.append({"name": name, "error": f"File exceeds max size {MAX_FILE_BYTES} bytes", "status_code": 413})
+                        continue
+                    # Back-pressure: wait for a free slot before reading the next entry
+                    slots.acquire()
+                    futures.append(bulk_pool().submit(store, name, content))
+            except (zipfile.BadZipFile, tarfile.TarError) as e:
+                rejected.append({"name": upload.filename, "error": f"Unreadable archive: {e}", "status_code": 400})
+
+        for future in futures:
+            result = future.result()
+            (rejected if "error" in result else documents).append(result)
+
+        logger.info(f"Bulk upload {batch_id}: {len(documents)} documents stored, {len(rejected)} rejected")
+        return {
+            "batch_id": str(batch_id) if publish else None,
+            "accepted": len(documents),
+            "rejected_count": len(rejected),
+            "documents": documents,
+            "rejected": rejected,
+        }
+
+    def document_exists(self, document_id: uuid.UUID) -> bool:
+        s = self.ctx.get_db_session()
+        try:
+            return s.query(Document.id).filter(Document.id == document_id).first() is not None
         finally:
             self.ctx.close_session(s)
 
@@ -556,6 +715,7 @@ class IngestionService:
             if not doc:
                 return None
             chunk_count = s.query(Chunk).filter(Chunk.document_id == document_id).count()
+            counts = conflict_counts(s, document_id=document_id)
             return {
                 "document": {
                     "id": str(doc.id),
@@ -566,8 +726,9 @@ class IngestionService:
                     "effective_at": doc.effective_at.isoformat() if doc.effective_at else None,
                 },
                 "total_chunks": chunk_count,
-                "total_conflicts": 0,
-                "total_dedup_groups": 0,
+                "total_conflicts": counts["total"],
+                "total_dedup_groups": counts["dedup_groups"],
+                "conflicts_by_label": counts["by_label"],
             }
         finally:
             self.ctx.close_session(s)
@@ -671,6 +832,7 @@ class IngestionService:
             
             # Delete document record
             s.delete(doc)
+            bump_corpus_version(s)
             s.commit()
             
             logger.info(f"Successfully deleted document: {document_id}")
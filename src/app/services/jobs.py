@@ -0,0 +1,251 @@
+"""
+Durable publish job queue backed by the `publish_jobs` table.
+
+The API enqueues jobs; worker processes (app/worker.py) claim them with
+`SELECT ... FOR UPDATE SKIP LOCKED`, so concurrent workers never take the same
+job. Every progress event is appended to `publish_job_events`, which is how
+`/publish-stream` follows a job, and durable stages are recorded as
+checkpoints so a retry can skip them. Jobs whose worker stopped heartbeating
+are picked up again (or failed once they are out of attempts).
+
+Writes of a running job are fenced on (worker_id, status='running'): a worker
+whose job was reclaimed gets `JobLost` on its next write and must stop.
+"""
+import uuid
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.app_models import Document, PublishJob, PublishJobEvent
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+CHECKPOINTS = ("chunked", "embedded")
+
+class JobLost(Exception):
+    """The job is no longer running under this worker (reclaimed by another worker or finished)."""
+
+def job_dict(job: PublishJob) -> dict:
+    return {
+        "job_id": str(job.id),
+        "document_id": str(job.document_id),
+        "batch_id": str(job.batch_id) if job.batch_id else None,
+        "docling": job.docling,
+        "status": job.status,
+        "checkpoint": job.checkpoint,
+        "attempts": job.attempts,
+        "event_seq": job.event_seq,
+        "last_event": job.last_event,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+def _active_job(s: Session, document_id: uuid.UUID) -> PublishJob | None:
+    return s.query(PublishJob).filter(
+        PublishJob.document_id == document_id,
+        PublishJob.status.in_(ACTIVE_STATUSES),
+    ).first()
+
+def enqueue_publish(s: Session, document_id: uuid.UUID, *, docling: bool = False, batch_id: uuid.UUID | None = None) -> PublishJob:
+    """Queue a publish job, or return the document's queued/running job if there is one."""
+    job = _active_job(s, document_id)
+    if job is None:
+        job = PublishJob(document_id=document_id, docling=docling, batch_id=batch_id, max_attempts=settings.job_max_attempts)
+        s.add(job)
+        try:
+            s.commit()
+            logger.info(f"Queued publish job {job.id} for document {document_id}")
+            return job
+        except IntegrityError:
+            # A concurrent enqueue inserted the active job first (uq_publish_jobs_active_document)
+            s.rollback()
+            job = _active_job(s, document_id)
+            if job is None:
+                raise
+    if batch_id and job.batch_id is None:
+        job.batch_id = batch_id
+        s.commit()
+    return job
+
+def get_job(job_id: uuid.UUID) -> dict | None:
+    s = SessionLocal()
+    try:
+        job = s.get(PublishJob, job_id)
+        return job_dict(job) if job else None
+    finally:
+        s.close()
+
+def events_since(job_id: uuid.UUID, seq: int) -> list[tuple[int, dict]]:
+    """(seq, event) of every event recorded after `seq`, oldest first."""
+    s = SessionLocal()
+    try:
+        return [
+            (event_seq, event)
+            for event_seq, event in s.query(PublishJobEvent.seq, PublishJobEvent.event)
+            .filter(PublishJobEvent.job_id == job_id, PublishJobEvent.seq > seq)
+            .order_by(PublishJobEvent.seq)
+            .all()
+        ]
+    finally:
+        s.close()
+
+def batch_status(batch_id: uuid.UUID) -> dict | None:
+    """Per-document publish state of a bulk upload batch."""
+    s = SessionLocal()
+    try:
+        rows = (
+            s.query(PublishJob, Document.title, Document.status)
+            .join(Document, Document.id == PublishJob.document_id)
+            .filter(PublishJob.batch_id == batch_id)
+            .order_by(PublishJob.created_at)
+            .all()
+        )
+        if not rows:
+            return None
+        counts = {}
+        documents = []
+        for job, title, doc_status in rows:
+            counts[job.status] = counts.get(job.status, 0) + 1
+            event = job.last_event or {}
+            documents.append({
+                "document_id": str(job.document_id),
+                "title": title,
+                "document_status": doc_status,
+                "job_id": str(job.id),
+                "job_status": job.status,
+                "stage": event.get("stage"),
+                "progress": event.get("progress"),
+                "attempts": job.attempts,
+                "error": job.error,
+            })
+        return {
+            "batch_id": str(batch_id),
+            "total": len(documents),
+            "counts": counts,
+            "done": counts.get("succeeded", 0) + counts.get("failed", 0) == len(documents),
+            "documents": documents,
+        }
+    finally:
+        s.close()
+
+def _terminal_failure(s: Session, job: PublishJob, error: str):
+    job.status = "failed"
+    job.error = error
+    job.finished_at = datetime.now(timezone.utc)
+    job.last_event = {"stage": "error", "error": error, "ok": False}
+    job.event_seq += 1
+    s.add(PublishJobEvent(job_id=job.id, seq=job.event_seq, event=job.last_event))
+
+def _fail_exhausted(s: Session, stale: datetime):
+    """Fail stale jobs that are out of attempts (e.g. their worker keeps crashing) instead of reclaiming them forever."""
+    exhausted = s.execute(
+        select(PublishJob)
+        .where(
+            PublishJob.status == "running",
+            PublishJob.heartbeat_at < stale,
+            PublishJob.attempts >= PublishJob.max_attempts,
+        )
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    for job in exhausted:
+        logger.error(f"Job {job.id} lost its worker {job.worker_id} on the last attempt ({job.attempts}/{job.max_attempts}), failing it")
+        _terminal_failure(s, job, job.error or f"Worker {job.worker_id} stopped responding")
+    if exhausted:
+        s.commit()
+
+def claim_next(worker_id: str) -> dict | None:
+    """Claim the oldest runnable job: queued and due, or running with a stale heartbeat and attempts left."""
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=settings.job_stale_seconds)
+    s = SessionLocal()
+    try:
+        _fail_exhausted(s, stale)
+        job = s.execute(
+            select(PublishJob)
+            .where(or_(
+                (PublishJob.status == "queued") & (PublishJob.run_after <= now),
+                (PublishJob.status == "running") & (PublishJob.heartbeat_at < stale) & (PublishJob.attempts < PublishJob.max_attempts),
+            ))
+            .order_by(PublishJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if not job:
+            return None
+        if job.status == "running":
+            logger.warning(f"Reclaiming stale job {job.id} from {job.worker_id}")
+        job.status = "running"
+        job.worker_id = worker_id
+        job.attempts += 1
+        job.heartbeat_at = now
+        s.commit()
+        return job_dict(job)
+    finally:
+        s.close()
+
+def _owned(job_id: uuid.UUID, worker_id: str):
+    return (PublishJob.id == job_id) & (PublishJob.worker_id == worker_id) & (PublishJob.status == "running")
+
+def _update(job_id: uuid.UUID, worker_id: str, **values):
+    s = SessionLocal()
+    try:
+        updated = s.query(PublishJob).filter(_owned(job_id, worker_id)).update(values, synchronize_session=False)
+        s.commit()
+    finally:
+        s.close()
+    if not updated:
+        raise JobLost(f"Job {job_id} is no longer running under {worker_id}")
+
+def heartbeat(job_id: uuid.UUID, worker_id: str):
+    _update(job_id, worker_id, heartbeat_at=datetime.now(timezone.utc))
+
+def record_event(job_id: uuid.UUID, worker_id: str, event: dict):
+    values = {
+        "last_event": event,
+        "event_seq": PublishJob.event_seq + 1,
+        "heartbeat_at": datetime.now(timezone.utc),
+    }
+    if event.get("stage") in CHECKPOINTS:
+        values["checkpoint"] = event["stage"]
+    s = SessionLocal()
+    try:
+        seq = s.execute(
+            update(PublishJob).where(_owned(job_id, worker_id)).values(**values).returning(PublishJob.event_seq)
+        ).scalar_one_or_none()
+        if seq is None:
+            s.rollback()
+            raise JobLost(f"Job {job_id} is no longer running under {worker_id}")
+        s.add(PublishJobEvent(job_id=job_id, seq=seq, event=event))
+        s.commit()
+    finally:
+        s.close()
+
+def complete(job_id: uuid.UUID, worker_id: str):
+    _update(job_id, worker_id, status="succeeded", error=None, finished_at=datetime.now(timezone.utc))
+
+def fail(job_id: uuid.UUID, worker_id: str, error: str, *, retry: bool = True):
+    """Requeue with exponential backoff while attempts remain, otherwise mark failed."""
+    s = SessionLocal()
+    try:
+        job = s.execute(select(PublishJob).where(_owned(job_id, worker_id)).with_for_update()).scalar_one_or_none()
+        if not job:
+            raise JobLost(f"Job {job_id} is no longer running under {worker_id}")
+        job.error = error
+        if retry and job.attempts < job.max_attempts:
+            job.status = "queued"
+            job.run_after = datetime.now(timezone.utc) + timedelta(seconds=settings.job_retry_backoff_seconds * 2 ** (job.attempts - 1))
+            logger.warning(f"Job {job_id} failed (attempt {job.attempts}/{job.max_attempts}), retrying: {error}")
+        else:
+            _terminal_failure(s, job, error)
+            logger.error(f"Job {job_id} failed permanently: {error}")
+        s.commit()
+    finally:
+        s.close()
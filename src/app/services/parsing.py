@@ -0,0 +1,136 @@
+"""
+Document parsers. Kept free of database and model imports so they can run
+in the CPU process pool (see services/executors.py).
+"""
+import os, re, io
+import tempfile
+import logging
+import pandas as pd
+from bs4 import BeautifulSoup
+from PyPDF2 import PdfReader
+from langchain_docling.loader import ExportType
+from langchain_community.document_loaders import RecursiveUrlLoader
+from langchain_docling import DoclingLoader
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def parse_url(url: str) -> bytes:
+    """
+    Fetch content from a URL and return it as bytes.
+    """
+    def bs4_extractor(html: str) -> str:
+        soup = BeautifulSoup(html, "lxml")
+        return re.sub(r"\n\n+", "\n\n", soup.text).strip()
+
+    loader = RecursiveUrlLoader(
+        url=url,
+        max_depth=1,
+        extractor=bs4_extractor,
+        timeout=10,
+    )
+    docs = loader.load()
+    if not docs:
+        raise ValueError(f"Failed to fetch content from URL: {url}")
+    return docs[0].page_content.encode('utf-8')
+
+def excel_parse(content: bytes) -> str:
+    df = pd.read_excel(io.BytesIO(content))
+
+    # Drop completely empty rows/cols
+    df.dropna(how="all", inplace=True)
+    df.dropna(axis=1, how="all", inplace=True)
+
+    # Round numeric columns to save tokens
+    for col in df.select_dtypes(include="number"):
+        df[col] = df[col].round(2)
+
+    # Compact TSV format
+    return df.to_csv(index=False, sep="\t", na_rep="")
+
+def csv_parse(content: bytes) -> str:
+    df = pd.read_csv(io.BytesIO(content), sep=None, engine='python')
+
+    # Drop completely empty rows/cols
+    df.dropna(how="all", inplace=True)
+    df.dropna(axis=1, how="all", inplace=True)
+
+    # Round numeric columns to save tokens
+    for col in df.select_dtypes(include="number"):
+        df[col] = df[col].round(2)
+
+    # Compact TSV format
+    return df.to_csv(index=False, sep="\t", na_rep="")
+
+def pdf_parse(content: bytes, docling: bool = False) -> tuple[str, list[int]]:
+    """
+    Extract text from a PDF.
+    Returns the text and the character offset where each page starts
+    (empty when the parser does not expose pages).
+    """
+    def clean_spaces(text: str) -> str:
+        text = re.sub(r"\n{3,}", "\n\n", text)
+
+        cleaned_lines = []
+        for line in text.splitlines():
+            if not line.strip():
+                cleaned_lines.append("")
+            else:
+                cleaned_lines.append(re.sub(r"[ \t]{2,}", " ", line.strip()))
+        merged = re.sub(r"(?<![.!?])\n(?!\n)", " ", "\n".join(cleaned_lines))
+        return merged.strip()
+
+    if not docling:
+        # Clean page by page so page boundaries can be tracked in the final text
+        reader = PdfReader(io.BytesIO(content))
+        pages = [clean_spaces((page.extract_text() or "").strip()) for page in reader.pages]
+        text, page_starts = "", []
+        for page in pages:
+            if text:
+                text += "\n\n"
+            page_starts.append(len(text))
+            text += page
+        return text, page_starts
+    
+    tmp_path = None
+    try:
+        # Write bytes to a temporary file so Docling can read it
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+            tmp_file.write(content)
+            tmp_path = tmp_file.name
+
+        loader = DoclingLoader(file_path=tmp_path, export_type=ExportType.MARKDOWN)
+        docs = loader.load()
+
+        if not docs:
+            raise ValueError("Failed to parse PDF content with Docling")
+
+        # Markdown export has no page boundaries; sections come from its headings
+        return clean_spaces(docs[0].page_content), []
+    except Exception as e:
+        raise ValueError(f"Error parsing PDF content: {e}")
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def parse_content(content: bytes, extension: str, docling: bool = False) -> tuple[str, list[int]]:
+    """
+    Parse raw file content based on extension.
+    Returns the text and the character offset of each page start (empty if unknown).
+    - PDF -> PyPDF2 (per page) or Docling
+    - Text/Markdown/URL -> simple text parsing
+    - Excel -> Convert to CSV(pandas) and parse CSV
+    - CSV -> CSV parsing
+    """
+    if extension == "pdf":
+        # Use PDF parsing pipeline
+        return pdf_parse(content, docling=docling)
+    elif extension in ["txt", "md"]:
+        # Simple text parsing
+        return content.decode(), []
+    elif extension in ["xlsx", "xls"]:
+        return excel_parse(content), []
+    elif extension == "csv":
+        return csv_parse(content), []
+
+    return "", []
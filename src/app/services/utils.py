@@ -1,201 +1,135 @@
-import torch
-import os, re, io
 import asyncio
-import tempfile
-import tiktoken
+import numpy as np
 import logging
-import pandas as pd
-from bs4 import BeautifulSoup
-from PyPDF2 import PdfReader
-from langchain_docling.loader import ExportType
-from langchain_community.document_loaders import RecursiveUrlLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_docling import DoclingLoader
+from xxhash import xxh64
 
 from ..providers.embeddings import EmbeddingsProvider
 from ..providers.llm import LLMProvider
-from ..providers.nli import NLIProvider
+from ..providers.nli import NLIProvider, NLI_LABELS
+from ..providers.cache import VerdictCache
 from ..models.app_models import Chunk
 from ..config import settings
+from .chunking import chunk_text
+from .parsing import parse_url, excel_parse, csv_parse, pdf_parse, parse_content
+from .executors import run_io
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-def parse_url(url: str) -> bytes:
+def embed_chunks(chunks: list[str], embedder: EmbeddingsProvider) -> np.ndarray:
     """
-    Fetch content from a URL and return it as bytes.
+    Embed all chunks of a document in length-bucketed batches.
+    Returns a float32 matrix with one row per chunk.
     """
-    def bs4_extractor(html: str) -> str:
-        soup = BeautifulSoup(html, "lxml")
-        return re.sub(r"\n\n+", "\n\n", soup.text).strip()
-
-    loader = RecursiveUrlLoader(
-        url=url,
-        max_depth=1,
-        extractor=bs4_extractor,
-        timeout=10,
-    )
-    docs = loader.load()
-    if not docs:
-        raise ValueError(f"Failed to fetch content from URL: {url}")
-    return docs[0].page_content.encode('utf-8')
-
-def excel_parse(content: bytes) -> str:
-    df = pd.read_excel(io.BytesIO(content))
-
-    # Drop completely empty rows/cols
-    df.dropna(how="all", inplace=True)
-    df.dropna(axis=1, how="all", inplace=True)
-
-    # Round numeric columns to save tokens
-    for col in df.select_dtypes(include="number"):
-        df[col] = df[col].round(2)
-
-    # Compact TSV format
-    return df.to_csv(index=False, sep="\t", na_rep="")
-
-def csv_parse(content: bytes) -> str:
-    df = pd.read_csv(io.BytesIO(content), sep=None, engine='python')
-
-    # Drop completely empty rows/cols
-    df.dropna(how="all", inplace=True)
-    df.dropna(axis=1, how="all", inplace=True)
-
-    # Round numeric columns to save tokens
-    for col in df.select_dtypes(include="number"):
-        df[col] = df[col].round(2)
-
-    # Compact TSV format
-    return df.to_csv(index=False, sep="\t", na_rep="")
-
-def pdf_parse(content: bytes, docling: bool = False) -> str:
-    def clean_spaces(text: str) -> str:
-        text = re.sub(r"\n{3,}", "\n\n", text)
-
-        cleaned_lines = []
-        for line in text.splitlines():
-            if not line.strip():
-                cleaned_lines.append("")
-            else:
-                cleaned_lines.append(re.sub(r"[ \t]{2,}", " ", line.strip()))
-        merged = re.sub(r"(?<![.!?])\n(?!\n)", " ", "\n".join(cleaned_lines))
-        return merged.strip()
-
-    if not docling:
-        reader = PdfReader(io.BytesIO(content))
-        text = [
-            (page.extract_text() or "").strip()
-            for page in reader.pages
-        ]
-        return clean_spaces("\n".join(text))
-    
-    tmp_path = None
-    try:
-        # Write bytes to a temporary file so Docling can read it
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-
-        loader = DoclingLoader(file_path=tmp_path, export_type=ExportType.MARKDOWN)
-        docs = loader.load()
+    return embedder.embed_batch(chunks)
 
-        if not docs:
-            raise ValueError("Failed to parse PDF content with Docling")
+def neighbor_hash(similar) -> str:
+    """Chunk hash of a Qdrant neighbour; points written before hashes were stored fall back to hashing the text."""
+    return similar.payload.get("hash") or xxh64(similar.payload['text'].encode()).hexdigest()
 
-        return clean_spaces(docs[0].page_content)
-    except Exception as e:
-        raise ValueError(f"Error parsing PDF content: {e}")
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            os.remove(tmp_path)
-
-def chunk_text(text: str) -> list[dict]:
+def nli_verdicts(pairs: dict[tuple[str, str], tuple[str, str]], model: NLIProvider, verdict_cache: VerdictCache | None = None) -> dict:
     """
-    Simple text chunking function that splits text into smaller chunks.
+    NLI verdicts for distinct pairs ({hash pair: (premise, hypothesis)}).
+    Cached verdicts are reused; the rest are scored in one length-sorted batched pass.
     """
-    if not text:
-        return []
-    
-    def tiktoken_len(text):
-        tokenizer = tiktoken.get_encoding("cl100k_base")
-        tokens = tokenizer.encode(text)
-        return len(tokens)
-
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=settings.chunk_size,
-        chunk_overlap=settings.chunk_overlap,
-        length_function=tiktoken_len,
-    )
-    chunks = splitter.split_text(text)
-
-    return [{
-            "text": chunk,
-            "page": None,  # Placeholder, can be set later if needed
-            "section_path": None,  # Placeholder, can be set later if needed
-            "hash": tiktoken_len(chunk),  # Use token length as a simple hash
-        } for chunk in chunks]
-
-def embed_chunks(chunks: list[str], embedder: EmbeddingsProvider) -> list[list[float]]:
-    if not chunks:
-        return []
-    return [embedder.embed_text(chunk) for chunk in chunks]
+    if not pairs:
+        return {}
+    verdicts = verdict_cache.get_many(list(pairs), model.model_key) if verdict_cache else {}
+    to_predict = {key: texts for key, texts in pairs.items() if key not in verdicts}
+    if to_predict:
+        logger.info(f"Batch NLI prediction ({model.model_key}) for {len(to_predict)} pairs ({len(pairs) - len(to_predict)} cached)")
+        probs = model.predict_proba(list(to_predict.values()))
+        labels = probs.argmax(axis=1)
+        confidences = probs.max(axis=1)
+        fresh = {
+            key: {"label": NLI_LABELS[label], "score": float(confidence), "judged_by": "nli"}
+            for key, label, confidence in zip(to_predict, labels, confidences)
+        }
+        if verdict_cache:
+            verdict_cache.put_many(fresh, model.model_key)
+        verdicts.update(fresh)
+    return verdicts
 
-async def check_conflicts(chunk: Chunk, similar_chunks: list, nli_model: NLIProvider, llm: LLMProvider, semaphore: asyncio.Semaphore) -> dict:
+async def check_conflicts(candidates: list[tuple[Chunk, list]], nli_model: NLIProvider, llm: LLMProvider, semaphore: asyncio.Semaphore,
+                          verdict_cache: VerdictCache | None = None, screen_model: NLIProvider | None = None) -> dict:
     """
-    Check for duplicates and contradictions in the given chunk against similar chunks.
+    Check for duplicates and contradictions across a whole document.
+    `candidates` pairs every chunk of the document with its similar chunks,
+    already limited to neighbours above the similarity floor.
     
-    Steps:
-        - Step 1: Use NLI model for a fast check.
-        - Step 2: Escalate to LLM for ambiguous cases.
-        - Step 3: Return structured results as well as any LLM tasks for further processing.
+    Steps (tiered cascade, each tier only sees what the previous one could not decide):
+        - Step 1: Screen every distinct pair with the small NLI model; it only clears confident
+                  `neutral` pairs (`judged_by="nli-screen"`), duplicates/contradictions always go on.
+        - Step 2: Score undecided pairs with the large NLI model (`judged_by="nli"`).
+        - Step 3: Escalate to LLM for ambiguous cases (`judged_by="llm"`).
+        - Step 4: Return structured results as well as any LLM tasks for further processing.
     """
     duplicates = []
     contradictions = []
 
-    # NLI Batch Prediction
-    if not similar_chunks:
+    pairs = [
+        (chunk, similar, (chunk.hash, neighbor_hash(similar)))
+        for chunk, similar_chunks in candidates
+        for similar in similar_chunks or []
+    ]
+    if not pairs:
         return {"duplicates": [], "contradictions": []}, []
 
-    sentence_pairs = [(chunk.text, similar.payload['text']) for similar in similar_chunks]
-    logger.info(f"Batch NLI prediction for {len(sentence_pairs)} pairs")
-    nli_logits = nli_model.predict(sentence_pairs)
-    nli_scores = torch.nn.functional.softmax(torch.tensor(nli_logits, device=device), dim=1)
+    texts = {}
+    for chunk, similar, key in pairs:
+        texts.setdefault(key, (chunk.text, similar.payload['text']))
+
+    # Tier 1: small screening model filters out the obviously unrelated pairs.
+    # It never creates a conflict: entailment/contradiction candidates are re-judged below.
+    decided = {}
+    if screen_model:
+        for key, verdict in (await run_io(nli_verdicts, texts, screen_model, verdict_cache)).items():
+            if verdict["label"] == "neutral" and verdict["score"] > settings.nli_screen_threshold:
+                decided[key] = {**verdict, "judged_by": "nli-screen"}
+        logger.info(f"NLI screening cleared {len(decided)} of {len(texts)} pairs as neutral")
+
+    # Tier 2: large NLI model on what the screen could not decide
+    thresholds = {
+        'entailment': settings.dedup_similarity_threshold,
+        'contradiction': settings.contradiction_score_threshold,
+        'neutral': settings.neutral_score_threshold,
+    }
+    undecided = {key: pair for key, pair in texts.items() if key not in decided}
+    nli_results = await run_io(nli_verdicts, undecided, nli_model, verdict_cache)
+    for key, verdict in nli_results.items():
+        if verdict["score"] > thresholds[verdict["label"]]:
+            decided[key] = verdict
 
     llm_escalation_tasks = []
-    for i, similar_chunk in enumerate(similar_chunks):
-        score_for_pair = nli_scores[i]
-        nli_label = ['contradiction', 'entailment', 'neutral'][score_for_pair.argmax()]
-        nli_confidence = score_for_pair.max()
-
+    for chunk, similar_chunk, pair_key in pairs:
         conflict_payload = {
             "chunk_id": str(chunk.id),
             "chunk_text": chunk.text,
             "conflicting_chunk_id": str(similar_chunk.id),
             "conflicting_chunk_text": similar_chunk.payload['text'],
-            "conflicting_document_id": similar_chunk.payload['document_id']
+            "conflicting_document_id": similar_chunk.payload['document_id'],
+            "neighbor_sim": float(similar_chunk.score),
         }
-        
-        # High-confidence NLI results
-        if nli_label == 'entailment' and nli_confidence > settings.dedup_similarity_threshold:
-            duplicates.append({**conflict_payload, "judged_by": "nli", "score": float(nli_confidence)})
-            continue
-        if nli_label == 'contradiction' and nli_confidence > settings.contradiction_score_threshold:
-            contradictions.append({**conflict_payload, "judged_by": "nli", "score": float(nli_confidence)})
-            continue
-        if nli_label == 'neutral' and nli_confidence > settings.neutral_score_threshold:
-            logger.info("Neutral")
+
+        verdict = decided.get(pair_key)
+        if verdict:
+            if verdict["label"] == 'entailment':
+                duplicates.append({**conflict_payload, "judged_by": verdict["judged_by"], "score": verdict["score"]})
+            elif verdict["label"] == 'contradiction':
+                contradictions.append({**conflict_payload, "judged_by": verdict["judged_by"], "score": verdict["score"]})
             continue
 
-        # Escalate ambiguous cases to LLM
+        # Tier 3: escalate ambiguous cases to LLM
+        nli_label, nli_confidence = nli_results[pair_key]["label"], nli_results[pair_key]["score"]
         logger.info(f"Ambiguous ({nli_label}, Conf: {nli_confidence:.2f}). Escalating to LLM.")
         task = llm.predict_conflict(
             llm=llm.conflict_llm,
             chunk1=chunk.text,
             chunk2=similar_chunk.payload['text'],
             semaphore=semaphore,
-            conflict_payload=conflict_payload
+            conflict_payload=conflict_payload,
+            verdict_cache=verdict_cache,
+            pair_key=pair_key
         )
         llm_escalation_tasks.append(task)
         
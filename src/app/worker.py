@@ -0,0 +1,95 @@
+"""
+Publish worker.
+
+Runs `settings.publish_workers` processes that claim publish jobs from the
+`publish_jobs` table and run the publish pipeline, recording every progress
+event on the job row. Start it next to the API:
+
+    python -m app.worker
+"""
+import os
+import socket
+import asyncio
+import logging
+import multiprocessing as mp
+
+from .config import settings
+from .providers import registry
+from .providers.app_context import AppContext
+from .services import executors, jobs
+from .services.executors import run_io
+from .services.ingestion_service import IngestionService
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+async def _heartbeat(job_id, worker_id: str):
+    while True:
+        await asyncio.sleep(settings.job_heartbeat_seconds)
+        try:
+            await run_io(jobs.heartbeat, job_id, worker_id)
+        except jobs.JobLost:
+            # The next event write raises too and stops the pipeline
+            logger.warning(f"Lost publish job {job_id} to another worker")
+            return
+
+async def run_job(svc: IngestionService, job: dict, worker_id: str):
+    job_id = job["job_id"]
+    logger.info(f"Running publish job {job_id} for document {job['document_id']} (attempt {job['attempts']}, checkpoint {job['checkpoint']})")
+    heartbeat = asyncio.create_task(_heartbeat(job_id, worker_id))
+    try:
+        async for event in svc.publish_document_stream(job["document_id"], docling=job["docling"], checkpoint=job["checkpoint"]):
+            await run_io(jobs.record_event, job_id, worker_id, event)
+            if event.get("stage") == "error":
+                # Pipeline-level failure (e.g. document deleted), retrying will not help
+                await run_io(jobs.fail, job_id, worker_id, event.get("error", "unknown error"), retry=False)
+                return
+        await run_io(jobs.complete, job_id, worker_id)
+    except jobs.JobLost as e:
+        # Reclaimed after a stale heartbeat: the new owner runs the job, leave its row alone
+        logger.warning(f"Abandoning publish job {job_id}: {e}")
+    except Exception as e:
+        logger.exception(f"Publish job {job_id} failed")
+        try:
+            await run_io(jobs.fail, job_id, worker_id, str(e))
+        except jobs.JobLost:
+            logger.warning(f"Publish job {job_id} was reclaimed, not recording the failure")
+    finally:
+        heartbeat.cancel()
+
+async def work(worker_id: str):
+    if settings.warm_up_models:
+        registry.warm_up()
+    svc = IngestionService()
+    svc.init_tenant(context=AppContext(), db=None)
+    logger.info(f"Worker {worker_id} polling for publish jobs")
+    while True:
+        job = await run_io(jobs.claim_next, worker_id)
+        if job is None:
+            await asyncio.sleep(settings.job_poll_interval)
+            continue
+        await run_job(svc, job, worker_id)
+
+def _worker_main(index: int):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    try:
+        asyncio.run(work(worker_id))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executors.shutdown()
+
+def main():
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_worker_main, args=(i,), name=f"publish-worker-{i}") for i in range(max(1, settings.publish_workers))]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+
+if __name__ == "__main__":
+    main()
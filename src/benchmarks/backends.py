@@ -0,0 +1,92 @@
+"""
+Accuracy parity and throughput of the ONNX / int8 backends against the torch path.
+
+Usage (from src/):
+    python -m benchmarks.backends --backend onnx --quantization avx512_vnni
+    python -m benchmarks.backends --pairs pairs.jsonl   # lines of {"premise": ..., "hypothesis": ...}
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.providers.embeddings import EmbeddingsProvider
+from app.providers.nli import NLIProvider
+
+SAMPLE_PAIRS = [
+    ("The device features a 5,000 mAh battery.", "With its 4,000 mAh battery, the device lasts a full day."),
+    ("The policy will take effect starting January 1st, 2026.", "The new rules are not effective until June 1st, 2026."),
+    ("Remote work is permitted for all employees in the engineering department.",
+     "The company has a strict office-first policy, requiring all staff to work from the designated company location."),
+    ("Our service guarantees an uptime of 99.99%, as outlined in our Service Level Agreement (SLA).",
+     "The SLA for the platform specifies a 99.99% uptime guarantee."),
+    ("The server's memory can be expanded up to a maximum of 256 GB of DDR5 RAM.", "The system's RAM is upgradeable."),
+    ("The project lead for the marketing campaign is Sarah Jenkins.", "The marketing campaign's budget is set at $250,000."),
+    ("The flight to London departs from Terminal 4 at 9:00 PM.",
+     "The airline primarily operates Boeing 787 aircraft on its transatlantic routes."),
+    ("Employees accrue 20 days of paid leave per year.", "Staff receive twenty days of annual paid vacation."),
+]
+
+def load_pairs(path: str | None, n: int) -> list[tuple[str, str]]:
+    if path:
+        with open(path) as f:
+            pairs = [(row["premise"], row["hypothesis"]) for row in map(json.loads, f) if row]
+    else:
+        pairs = SAMPLE_PAIRS
+    return (pairs * (n // len(pairs) + 1))[:n]
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+def bench_nli(pairs, backend, quantization):
+    reference, candidate = NLIProvider(backend="torch"), NLIProvider(backend=backend, quantization=quantization)
+    reference.predict_proba(pairs[:8]), candidate.predict_proba(pairs[:8])  # warm-up
+    ref_probs, ref_time = timed(reference.predict_proba, pairs)
+    cand_probs, cand_time = timed(candidate.predict_proba, pairs)
+    return {
+        "pairs": len(pairs),
+        "label_agreement": float((ref_probs.argmax(axis=1) == cand_probs.argmax(axis=1)).mean()),
+        "max_prob_delta": float(np.abs(ref_probs - cand_probs).max()),
+        "torch_pairs_per_s": len(pairs) / ref_time,
+        f"{candidate.model_key}_pairs_per_s": len(pairs) / cand_time,
+        "speedup": ref_time / cand_time,
+    }
+
+def bench_embeddings(texts, backend, quantization):
+    reference, candidate = EmbeddingsProvider(backend="torch"), EmbeddingsProvider(backend=backend, quantization=quantization)
+    reference.embed_batch(texts[:8]), candidate.embed_batch(texts[:8])  # warm-up
+    ref_vecs, ref_time = timed(reference.embed_batch, texts)
+    cand_vecs, cand_time = timed(candidate.embed_batch, texts)
+    cosine = (ref_vecs * cand_vecs).sum(axis=1)  # both are L2-normalized
+    return {
+        "texts": len(texts),
+        "mean_cosine": float(cosine.mean()),
+        "min_cosine": float(cosine.min()),
+        "torch_texts_per_s": len(texts) / ref_time,
+        f"{candidate.model_key}_texts_per_s": len(texts) / cand_time,
+        "speedup": ref_time / cand_time,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="onnx")
+    parser.add_argument("--quantization", default="")
+    parser.add_argument("--pairs", help="JSONL file of premise/hypothesis pairs")
+    parser.add_argument("-n", type=int, default=512, help="number of pairs to score")
+    parser.add_argument("--min-agreement", type=float, default=0.95, help="fail below this NLI label agreement")
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.pairs, args.n)
+    results = {
+        "nli": bench_nli(pairs, args.backend, args.quantization),
+        "embeddings": bench_embeddings([t for pair in pairs for t in pair], args.backend, args.quantization),
+    }
+    print(json.dumps(results, indent=2))
+    if results["nli"]["label_agreement"] < args.min_agreement:
+        raise SystemExit(f"NLI label agreement {results['nli']['label_agreement']:.3f} below {args.min_agreement}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Single-pass token-offset chunker vs. the previous RecursiveCharacterTextSplitter setup.
+
+Usage (from src/):
+    python -m benchmarks.chunking                  # 10 MB synthetic document
+    python -m benchmarks.chunking --mb 1 --input policy.md
+"""
+import argparse
+import json
+import random
+import time
+
+import tiktoken
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.config import settings
+from app.services.chunking import chunk_text, get_encoding
+
+WORDS = ("policy employee leave days approval manager request remote office security data access "
+         "contract renewal budget quarter review audit compliance training benefits salary").split()
+
+def synthetic_text(n_bytes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts, size, section = [], 0, 0
+    while size < n_bytes:
+        if rng.random() < 0.02:
+            section += 1
+            part = f"\n\n## Section {section}\n\n"
+        else:
+            part = " ".join(rng.choices(WORDS, k=rng.randint(8, 30))).capitalize() + ". "
+            if rng.random() < 0.2:
+                part += "\n\n"
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+def baseline_chunk_text(text: str) -> list[str]:
+    """The splitter chunk_text used before: re-tokenizes candidate splits through tiktoken_len."""
+    def tiktoken_len(text):
+        tokenizer = tiktoken.get_encoding("cl100k_base")
+        return len(tokenizer.encode(text))
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.chunk_size,
+        chunk_overlap=settings.chunk_overlap,
+        length_function=tiktoken_len,
+    )
+    return splitter.split_text(text)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=10.0, help="size of the synthetic document")
+    parser.add_argument("--input", help="benchmark this text file instead of synthetic text")
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = synthetic_text(int(args.mb * 1024 * 1024))
+    get_encoding(), chunk_text("warm up")  # load the encoding and token length table
+
+    results = {"bytes": len(text.encode()), "chunk_size": settings.chunk_size, "chunk_overlap": settings.chunk_overlap}
+    start = time.perf_counter()
+    chunks = chunk_text(text)
+    results["token_offset"] = {"seconds": time.perf_counter() - start, "chunks": len(chunks)}
+
+    if not args.skip_baseline:
+        start = time.perf_counter()
+        baseline = baseline_chunk_text(text)
+        results["recursive_splitter"] = {"seconds": time.perf_counter() - start, "chunks": len(baseline)}
+        results["speedup"] = results["recursive_splitter"]["seconds"] / results["token_offset"]["seconds"]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Event-loop responsiveness during a publish.
+
+Uploads a large generated document to a running API, queues its publish job,
+and probes GET /health until a worker has finished the job (polling
+GET /documents/jobs/{job_id}). With publishing in the worker processes,
+/health latency while publishing should stay close to the idle baseline.
+
+Usage (from src/, against a running stack):
+    python -m benchmarks.health_latency --api http://localhost:8000 --mb 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.chunking import synthetic_text
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+async def wait_for_job(client: httpx.AsyncClient, job_id: str, poll: float, timeout: float) -> dict:
+    deadline = time.perf_counter() + timeout
+    while True:
+        response = await client.get(f"/documents/jobs/{job_id}")
+        response.raise_for_status()
+        job = response.json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        if time.perf_counter() > deadline:
+            raise SystemExit(f"Publish job {job_id} still {job['status']} after {timeout}s, is a worker running?")
+        await asyncio.sleep(poll)
+
+def summary(latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"samples": 0}
+    return {
+        "samples": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api", default="http://localhost:8000")
+    parser.add_argument("--mb", type=float, default=5.0, help="size of the generated document")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between /health probes")
+    parser.add_argument("--poll", type=float, default=0.5, help="seconds between publish job polls")
+    parser.add_argument("--timeout", type=float, default=1800, help="give up waiting for the publish job after this many seconds")
+    parser.add_argument("--max-ratio", type=float, default=5.0, help="fail if busy p95 exceeds idle p95 by this factor")
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.api, timeout=600) as client:
+        # Idle baseline
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, args.interval))
+        await asyncio.sleep(3)
+        stop.set()
+        idle = await task
+
+        # Upload, then probe while publishing
+        text = synthetic_text(int(args.mb * 1024 * 1024), seed=int(time.time()))
+        upload = await client.post("/documents", files={"file": (f"latency-{int(time.time())}.md", text.encode(), "text/markdown")})
+        upload.raise_for_status()
+        document_id = upload.json()["document_id"]
+
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, stop, args.interval))
+        start = time.perf_counter()
+        job = None
+        try:
+            publish = await client.post(f"/documents/{document_id}/publish")
+            publish.raise_for_status()
+            job = publish.json()
+            job = await wait_for_job(client, job["job_id"], args.poll, args.timeout)
+            publish_seconds = time.perf_counter() - start
+        finally:
+            stop.set()
+            busy = await task
+            # Never delete under a worker that is still publishing the document
+            if job is None or job["status"] not in ("queued", "running"):
+                await client.delete(f"/documents/{document_id}")
+            else:
+                print(f"Left document {document_id} in place, its publish job {job['job_id']} has not finished")
+
+    results = {"idle": summary(idle), "publishing": summary(busy), "publish_seconds": round(publish_seconds, 2), "job_status": job["status"]}
+    print(json.dumps(results, indent=2))
+    if job["status"] != "succeeded":
+        raise SystemExit(f"Publish job failed: {job['error']}")
+    if not idle or not busy:
+        raise SystemExit("No /health samples collected")
+    if results["publishing"]["p95_ms"] > args.max_ratio * max(results["idle"]["p95_ms"], 1.0):
+        raise SystemExit("/health latency degraded while publishing")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+import bisect
+
+import pytest
+
+from app.services.chunking import chunk_text, get_encoding
+
+PAGES = [
+    "Company handbook, revision 3. Read it before your first day.\n\n"
+    "# Handbook\n\n"
+    + "Everyone works from the office on Tuesdays and Thursdays. " * 6 + "\n\n"
+    "## Leave\n\n"
+    + "Annual leave is booked in the HR portal two weeks ahead. " * 6 + "\n\n",
+    "### Sick leave\n\n"
+    + "Report sick leave to your manager before nine in the morning. " * 6 + "\n\n"
+    "# Expenses\n\n"
+    + "Expenses above fifty euros need a receipt and a cost center. " * 6 + "\n",
+]
+TEXT = "".join(PAGES)
+PAGE_STARTS = [0, len(PAGES[0])]
+HEADINGS = [
+    (TEXT.index("# Handbook"), "Handbook"),
+    (TEXT.index("## Leave"), "Handbook > Leave"),
+    (TEXT.index("### Sick leave"), "Handbook > Leave > Sick leave"),
+    (TEXT.index("# Expenses"), "Expenses"),
+]
+
+def test_windows_follow_token_offsets():
+    tokens = get_encoding().encode(TEXT)
+    chunks = chunk_text(TEXT, chunk_size=32, chunk_overlap=8)
+
+    expected = []
+    for start in range(0, len(tokens), 24):
+        expected.append(get_encoding().decode(tokens[start:start + 32]).strip())
+        if start + 32 >= len(tokens):
+            break
+    assert [c["text"] for c in chunks] == expected
+
+def test_consecutive_windows_overlap():
+    tokens = get_encoding().encode(TEXT)
+    chunks = chunk_text(TEXT, chunk_size=32, chunk_overlap=8)
+
+    assert len(chunks) > 2
+    for i, (previous, current) in enumerate(zip(chunks, chunks[1:]), start=1):
+        # The 8 tokens that end one window start the next one
+        shared = get_encoding().decode(tokens[i * 24:i * 24 + 8]).strip()
+        assert shared and shared in previous["text"]
+        assert current["text"].startswith(shared)
+
+def test_page_and_section_attribution():
+    chunks = chunk_text(TEXT, page_starts=PAGE_STARTS, chunk_size=16, chunk_overlap=0)
+
+    cursor = 0
+    for chunk in chunks:
+        # Windows do not overlap, so each chunk starts after the previous one ends
+        position = TEXT.index(chunk["text"], cursor)
+        cursor = position + len(chunk["text"])
+        heading = bisect.bisect_right([offset for offset, _ in HEADINGS], position) - 1
+        assert chunk["page"] == bisect.bisect_right(PAGE_STARTS, position)
+        assert chunk["section_path"] == (HEADINGS[heading][1] if heading >= 0 else None)
+
+    assert chunks[0]["page"] == 1 and chunks[0]["section_path"] is None
+    assert chunks[-1]["page"] == 2 and chunks[-1]["section_path"] == "Expenses"
+    assert {c["section_path"] for c in chunks} >= {path for _, path in HEADINGS}
+
+def test_without_page_starts_pages_are_unknown():
+    assert all(c["page"] is None for c in chunk_text(TEXT, chunk_size=64, chunk_overlap=0))
+
+def test_multibyte_text_is_not_split_inside_a_character():
+    text = "Café résumé naïve coöperation. " * 40
+    chunks = chunk_text(text, chunk_size=7, chunk_overlap=2)
+
+    assert chunks
+    for chunk in chunks:
+        assert chunk["text"] in text
+
+@pytest.mark.parametrize("overlap", [-1, 32, 40])
+def test_rejects_overlap_outside_the_window(overlap):
+    with pytest.raises(ValueError):
+        chunk_text(TEXT, chunk_size=32, chunk_overlap=overlap)
+
+def test_empty_text_has_no_chunks():
+    assert chunk_text("", chunk_size=32, chunk_overlap=8) == []
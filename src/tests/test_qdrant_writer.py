@@ -0,0 +1,52 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from app.providers.qdrant_client import BulkPointWriter
+
+COLLECTION = "writer_test"
+
+@pytest.fixture
+def client(monkeypatch):
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION, vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    calls = []
+    upsert = client.upsert
+
+    def spy(**kwargs):
+        calls.append((len(kwargs["points"]), kwargs["wait"]))
+        return upsert(**kwargs)
+
+    monkeypatch.setattr(client, "upsert", spy)
+    client.calls = calls
+    return client
+
+def points(start: int, count: int) -> list[PointStruct]:
+    return [PointStruct(id=i, vector=[1.0, float(i), 0.5, 0.0], payload={"idx": i}) for i in range(start, start + count)]
+
+def test_flush_writes_every_point_and_waits_on_the_last_batch(client):
+    writer = BulkPointWriter(client, COLLECTION, batch_size=10, wait=False)
+    for start in range(0, 25, 7):
+        writer.write(points(start, min(7, 25 - start)))
+    writer.flush()
+    writer.close()
+
+    assert client.count(COLLECTION).count == 25
+    assert writer.written == 25
+    assert client.calls == [(10, False), (10, False), (5, True)]
+
+def test_exact_multiple_of_batch_size_keeps_a_final_waiting_batch(client):
+    with BulkPointWriter(client, COLLECTION, batch_size=10, wait=False) as writer:
+        writer.write(points(0, 20))
+
+    assert client.count(COLLECTION).count == 20
+    assert client.calls == [(10, False), (10, True)]
+
+def test_error_in_block_skips_the_flush(client):
+    with pytest.raises(RuntimeError):
+        with BulkPointWriter(client, COLLECTION, batch_size=10, wait=False) as writer:
+            writer.write(points(0, 5))
+            raise RuntimeError("encoding failed")
+
+    assert client.calls == []
+    assert client.count(COLLECTION).count == 0